@@ -0,0 +1,79 @@
+from typing import List, Optional
+
+from numpy import (
+    add, argpartition, argsort, bincount, concatenate, cumsum, float32, int64, load, savez, zeros)
+from numpy.random import default_rng
+from numpy.typing import NDArray
+
+from quantization import dot, normalize
+
+
+class IVFIndex:
+    """
+    Inverted file index over unit-length vectors. Vectors are clustered with
+    spherical k-means and a query is only compared with the members of the
+    n_probe clusters whose centroids are closest to it.
+    """
+
+    def __init__(self, centroids: NDArray[float32], order: NDArray[int64], offsets: NDArray[int64]):
+        self.centroids = centroids
+        self.n_probe = 8
+        self._offsets = offsets
+        self._order = order
+
+    @classmethod
+    def build(cls, vectors: NDArray[float32], n_lists: int = 0, iterations: int = 10,
+            seed: int = 0) -> 'IVFIndex':
+        """
+        :param vectors: unit-length float32 rows
+        :param n_lists: number of clusters; defaults to 4 * sqrt(len(vectors))
+        """
+        n_lists = min(n_lists or int(4 * len(vectors) ** 0.5), len(vectors))
+        rng = default_rng(seed)
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = cls._assign(vectors, centroids)
+            sums = zeros(centroids.shape, dtype=float32)
+            add.at(sums, assignments, vectors)
+            counts = bincount(assignments, minlength=n_lists)
+            # Empty clusters keep their previous centroid.
+            centroids[counts > 0] = normalize(sums[counts > 0])
+        assignments = cls._assign(vectors, centroids)
+        order = argsort(assignments, kind='stable').astype(int64)
+        offsets = zeros(n_lists + 1, dtype=int64)
+        offsets[1:] = cumsum(bincount(assignments, minlength=n_lists))
+        return cls(centroids, order, offsets)
+
+    @classmethod
+    def load(cls, file_name: str) -> 'IVFIndex':
+        with load(file_name) as arrays:
+            return cls(arrays['centroids'], arrays['order'], arrays['offsets'])
+
+    def save(self, file_name: str) -> None:
+        with open(file_name, 'wb') as f:
+            savez(f, centroids=self.centroids, order=self._order, offsets=self._offsets)
+        return None
+
+    def search(self, values: NDArray, scales: Optional[NDArray[float32]],
+            queries: NDArray[float32]) -> List[int]:
+        """
+        :param values: the (possibly quantized) rows the index was built from
+        :return: the approximately nearest row for each query
+        """
+        n_probe = min(self.n_probe, len(self.centroids))
+        probes = argpartition(-(queries @ self.centroids.T), n_probe - 1, axis=1)[:, :n_probe]
+        nearest = []
+        for query, lists in zip(queries, probes):
+            candidates = concatenate(
+                [self._order[self._offsets[i]:self._offsets[i + 1]] for i in lists])
+            candidate_scales = None if scales is None else scales[candidates]
+            nearest.append(int(candidates[dot(values[candidates], candidate_scales, query).argmax()]))
+        return nearest
+
+    @staticmethod
+    def _assign(vectors: NDArray[float32], centroids: NDArray[float32]) -> NDArray[int64]:
+        assignments = zeros(len(vectors), dtype=int64)
+        for start in range(0, len(vectors), 1 << 14):
+            assignments[start:start + (1 << 14)] = (
+                vectors[start:start + (1 << 14)] @ centroids.T).argmax(axis=1)
+        return assignments
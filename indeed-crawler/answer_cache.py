@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from json import dump as dump_json, load as load_json
+from os import path, replace
+from threading import Lock
+from typing import Iterable, Optional
+
+from knowledge_base import normalize_text
+
+
+class AnswerCache:
+    """
+    Bounded LRU cache of answers found by embedding search, persisted between
+    runs. Entries are dropped whenever the compiled knowledge base changes.
+    Safe to share between the threads of a worker pool.
+    """
+
+    def __init__(self, file_name: str = 'answer_cache.json', max_size: int = 10000):
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._file_name = file_name
+        self._lock = Lock()
+        self._max_size = max_size
+        self._version = ''
+
+    def get(self, text: str, options: Iterable[str] = ()) -> Optional[str]:
+        key = self._key(text, options)
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return answer
+
+    def load(self, version: str) -> None:
+        """
+        :param version: key of the knowledge base the cached answers must come from
+        """
+        self._entries.clear()
+        self._version = version
+        if path.exists(self._file_name):
+            with open(self._file_name) as f:
+                stored = load_json(f)
+            if stored.get('version') == version:
+                self._entries.update(stored['entries'][-self._max_size:])
+        return None
+
+    def put(self, text: str, answer: str, options: Iterable[str] = ()) -> None:
+        key = self._key(text, options)
+        with self._lock:
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+            self._dirty = True
+        return None
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return None
+            with open(f"{self._file_name}.tmp", 'w') as f:
+                dump_json({'version': self._version, 'entries': list(self._entries.items())}, f)
+            replace(f"{self._file_name}.tmp", self._file_name)
+            self._dirty = False
+        return None
+
+    @staticmethod
+    def _key(text: str, options: Iterable[str]) -> str:
+        # Options are a set on the page, so their order must not matter.
+        return '\x1f'.join([normalize_text(text), *sorted(set(options))])
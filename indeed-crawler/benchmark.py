@@ -0,0 +1,388 @@
+from argparse import ArgumentParser
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import load as load_json
+from os import chdir, getcwd, path
+from queue import Queue
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import perf_counter, sleep
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from fasttext import load_model
+from numpy import abs as absolute, array, float32, inf, load, mean, vectorize
+from numpy.random import default_rng
+from numpy.typing import NDArray
+from undetected_chromedriver import find_chrome_executable
+
+from ann_index import IVFIndex
+from blocking import BlockingProfile
+from indeed_crawler import IndeedCrawler
+from negate_matcher import NegateMatcher
+from quantization import dequantize, dot, dtypes, normalize, quantize
+from word_vectors import WordVectors
+
+
+class _FakeJobSite(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the pages IndeedCrawler._apply_to_job walks through:
+    a job page, one screening question, a review page and a submit page.
+    Every page carries an image, a web font, audio and a tracking script,
+    none of them cacheable, as the requests a blocking profile saves, and a
+    captcha image it must not block. They are served from made up hosts that
+    the browser resolves to this server and that the default blocking rules
+    match; made up, so that Chrome's HSTS preload list leaves them on http.
+    """
+    asset_hosts = {'captcha': 'imgs.fake-hcaptcha.com', 'static': 'static.fake-indeed.com',
+                   'tracker': 'ads.fake-doubleclick.net'}
+    asset_size = 100000
+    latency = 0.0
+
+    def do_GET(self) -> None:
+        sleep(self.latency)
+        url = urlparse(self.path)
+        if url.path.startswith('/assets/'):
+            return self._send_asset(url.path)
+        jk = parse_qs(url.query).get('jk', [''])[0] or url.path.split('/')[-2]
+        if url.path == '/viewjob':
+            body = self._button('Apply now', f"/apply/{jk}/questions")
+        elif url.path.endswith('/questions'):
+            body = ('<div class="ia-Questions-item"><label for="q0">What is your name?</label>'
+                    '<input type="text" name="q0" id="q0"></div>'
+                    + self._button('Continue', f"/apply/{jk}/review"))
+        elif url.path.endswith('/review'):
+            body = self._button('Review your application', f"/apply/{jk}/submit")
+        elif url.path.endswith('/submit'):
+            body = self._button('Submit your application', f"/apply/{jk}/post-apply")
+        else:
+            body = '<p>Benchmark site</p>'
+        static, tracker = self.asset_hosts['static'], self.asset_hosts['tracker']
+        head = (f"<link rel=\"stylesheet\" href=\"http://{static}/assets/site.css\">"
+                f"<script src=\"http://{tracker}/assets/tracker.js\"></script>")
+        body = (f"<img src=\"http://{static}/assets/{jk}/banner.png\">"
+                f"<audio src=\"http://{static}/assets/{jk}/intro.mp3\" preload=\"auto\"></audio>"
+                f"<img src=\"http://{self.asset_hosts['captcha']}/assets/{jk}/challenge.png\">"
+                f"{body}")
+        self._send(f"<html><head>{head}</head><body>{body}</body></html>".encode(), 'text/html')
+        return None
+
+    def log_message(self, *args) -> None:
+        return None
+
+    @staticmethod
+    def _button(text: str, href: str) -> str:
+        return f"<button onclick=\"location.href='{href}'\"><span>{text}</span></button>"
+
+    def _send(self, content: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        return None
+
+    def _send_asset(self, asset: str) -> None:
+        if asset.endswith('.css'):
+            return self._send(b"@font-face{font-family:site;src:url(/assets/site.woff2)}"
+                              b"body{font-family:site}", 'text/css')
+        if asset.endswith('.js'):
+            return self._send(b"window.tracked=true;" + b" " * (self.asset_size // 4),
+                              'text/javascript')
+        content_type = {'mp3': 'audio/mpeg', 'woff2': 'font/woff2'}.get(
+            asset.rpartition('.')[2], 'image/png')
+        return self._send(bytes(self.asset_size), content_type)
+
+
+def _apply_on_fake_site(site: str, number_of_workers: int, number_of_jobs: int, run: str,
+        blocking_profile: Optional[BlockingProfile] = None) -> Tuple[int, float]:
+    """
+    :param run: prefix of the job keys, unique per call so no job counts as applied already
+    :return: the number of jobs applied to and the seconds it took
+    """
+    crawler = IndeedCrawler(0, {'What is your name?': 'Benchmark'})
+    crawler.blocking_profile = blocking_profile
+    crawler.chrome_arguments = ['--host-resolver-rules=' + ', '.join(
+        f"MAP {host} {urlparse(site).netloc}" for host in _FakeJobSite.asset_hosts.values())]
+    crawler.fidget_time = (0.1, 0.2)
+    crawler.number_of_workers = number_of_workers
+    crawler.page_load_time = (0.5, 0.5)
+    crawler.setup_browser()
+    crawler._browser.get(site)
+    crawler._start_workers()
+    candidates = Queue()
+    for i in range(number_of_jobs):
+        jk = f"{run}-{i}"
+        candidates.put({'jk': jk, 'title': 'Benchmark', 'company': '', 'salary': '',
+                        'location': '', 'url': f"{site}/viewjob?jk={jk}", 'start': 0})
+    candidates.put(None)
+    progress = {'applied': 0, 'done': False, 'start': 0}
+    start_t = perf_counter()
+    crawler._apply_candidates(candidates, Event(), progress, number_of_jobs, 'benchmark', site,
+                              Counter({0: number_of_jobs}))
+    elapsed = perf_counter() - start_t
+    for worker in crawler._workers:
+        worker._collect_network()
+    crawler._stop_workers()
+    crawler._browser.quit()
+    return progress['applied'], elapsed
+
+
+def _leave_one_out(values: NDArray, scales: Optional[NDArray[float32]],
+        queries: NDArray[float32]) -> Tuple[List[int], float]:
+    # Nearest other question for every question, and the mean lookup time.
+    nearest = []
+    start_t = perf_counter()
+    for i, query in enumerate(queries):
+        scores = dot(values, scales, query)
+        scores[i] = -inf
+        nearest.append(int(scores.argmax()))
+    return nearest, (perf_counter() - start_t) / len(queries)
+
+
+def _load_questions(q_and_a_file: str) -> Tuple[List[str], List[str]]:
+    # Questions are labelled with their field, or with their answer if private.
+    with open(q_and_a_file) as f:
+        q_and_a = load_json(f)
+    questions, labels = [], []
+    for field, dict_ in q_and_a.items():
+        for question, answer in dict_.items():
+            questions.append(question)
+            labels.append(answer if field == 'Private' else field)
+    return questions, labels
+
+
+def _serve_fake_site(latency: float) -> Tuple[ThreadingHTTPServer, str]:
+    # Fails before the server starts rather than on a driver download deep in setup_browser.
+    if find_chrome_executable() is None:
+        raise SystemExit('This benchmark drives a real browser and needs Chrome installed.')
+    _FakeJobSite.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeJobSite)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def ann_report(size: int, dim: int, number_of_queries: int, knowledge_base: str) -> None:
+    rng = default_rng(0)
+    if knowledge_base:
+        with open(path.join(knowledge_base, 'manifest.json')) as f:
+            manifest = load_json(f)
+        vectors = load(path.join(knowledge_base, manifest['vectors']))
+        scales = (load(path.join(knowledge_base, manifest['scales']))
+                  if manifest['scales'] else None)
+        vectors = dequantize(vectors, scales)
+        source = f"{len(vectors)} questions from {knowledge_base}"
+    else:
+        # Paraphrases are simulated as noisy copies of a smaller set of intents.
+        intents = normalize(rng.normal(size=(max(size // 25, 1), dim)).astype(float32))
+        vectors = normalize(intents[rng.integers(0, len(intents), size)]
+                            + 0.08 * rng.normal(size=(size, dim)).astype(float32))
+        source = f"{size} synthetic {dim}-d questions"
+    queries = normalize(vectors[rng.integers(0, len(vectors), number_of_queries)]
+                        + 0.05 * rng.normal(size=(number_of_queries, vectors.shape[1])).astype(float32))
+    start_t = perf_counter()
+    exact = [int((vectors @ query).argmax()) for query in queries]
+    exact_latency = (perf_counter() - start_t) / number_of_queries
+    start_t = perf_counter()
+    index = IVFIndex.build(vectors)
+    build_time = perf_counter() - start_t
+    print(f"{source}, {number_of_queries} queries, {len(index.centroids)} lists "
+          f"built in {build_time:.1f} s.")
+    print(f"{'search':<16}{'recall@1':>10}{'us/query':>10}")
+    print(f"{'exact':<16}{1:>10.1%}{exact_latency * 1e6:>10.1f}")
+    for n_probe in (1, 2, 4, 8, 16, 32):
+        index.n_probe = n_probe
+        start_t = perf_counter()
+        nearest = [index.search(vectors, None, query[None])[0] for query in queries]
+        latency = (perf_counter() - start_t) / number_of_queries
+        recall = mean([a == b for a, b in zip(nearest, exact)])
+        print(f"{f'ivf n_probe={n_probe}':<16}{recall:>10.1%}{latency * 1e6:>10.1f}")
+    return None
+
+
+def blocking_report(number_of_jobs: int, latency: float) -> None:
+    # The first profile blocks nothing and is the baseline the savings are measured from.
+    profiles = [('none', BlockingProfile(allow_domains=(), deny_domains=(), deny_types={})),
+                ('default', BlockingProfile()),
+                ('strict', BlockingProfile(deny_types={
+                    'Font': ('*',), 'Image': ('*',), 'Media': ('*',)}))]
+    server, site = _serve_fake_site(latency)
+    cwd = getcwd()
+    print(f"Applying to {number_of_jobs} jobs on a local site with {latency * 1e3:.0f} ms "
+          f"page latency under each blocking profile.")
+    print(f"{'profile':<10}{'applied':>9}{'s':>9}{'blocked':>9}{'loaded':>8}{'MB':>8}"
+          f"{'MB saved':>10}")
+    try:
+        with TemporaryDirectory() as directory:
+            chdir(directory)
+            baseline = None
+            for name, profile in profiles:
+                applied, elapsed = _apply_on_fake_site(site, 1, number_of_jobs, name, profile)
+                loaded_bytes = sum(profile.loaded_bytes.values())
+                baseline = loaded_bytes if baseline is None else baseline
+                print(f"{name:<10}{applied:>9}{elapsed:>9.1f}{sum(profile.blocked.values()):>9}"
+                      f"{sum(profile.loaded.values()):>8}{loaded_bytes / 1e6:>8.2f}"
+                      f"{(baseline - loaded_bytes) / 1e6:>10.2f}")
+    finally:
+        chdir(cwd)
+        server.shutdown()
+    return None
+
+
+def encoder_report(model_file: str, store: str, q_and_a_file: str, repeat: int) -> None:
+    questions, _ = _load_questions(q_and_a_file)
+    sentences = array(questions, dtype=str)
+    word_vectors = WordVectors(store)
+    encoders = [('vectorize(store)', vectorize(
+                    word_vectors.get_sentence_vector, otypes=[float32], signature='()->(n)')),
+                ('batch(store)', word_vectors.get_sentence_vectors)]
+    reference = None
+    if path.exists(model_file):
+        model = load_model(model_file)
+        encoders.insert(0, ('vectorize(fasttext)', vectorize(
+            model.get_sentence_vector, otypes=[float32], signature='()->(n)')))
+        reference = encoders[0][1](sentences)
+    print(f"Encoding {len(questions)} questions from {q_and_a_file}, best of {repeat}.")
+    print(f"{'encoder':<22}{'ms':>9}{'max abs diff':>14}")
+    for name, encode in encoders:
+        timings = []
+        for _ in range(repeat):
+            start_t = perf_counter()
+            vectors = encode(sentences)
+            timings.append(perf_counter() - start_t)
+        difference = 'n/a' if reference is None else f"{absolute(vectors - reference).max():.2e}"
+        print(f"{name:<22}{min(timings) * 1e3:>9.1f}{difference:>14}")
+    return None
+
+
+def negate_report(number_of_terms: int, number_of_titles: int) -> None:
+    rng = default_rng(0)
+    # Made up words of 3 to 9 letters; terms are one or two of them, titles three to six.
+    words = [''.join(rng.choice(list('abcdefghijklmnopqrstuvwxyz'), rng.integers(3, 10)))
+             for _ in range(5000)]
+    terms = [' '.join(rng.choice(words, rng.integers(1, 3))) for _ in range(number_of_terms)]
+    titles = [' '.join(rng.choice(words, rng.integers(3, 7))).title()
+              for _ in range(number_of_titles)]
+    print(f"Screening {number_of_titles} synthetic titles against {number_of_terms} terms.")
+    print(f"{'matcher':<22}{'us/title':>10}{'negated':>9}{'agreement':>11}")
+    start_t = perf_counter()
+    # The loop the crawler used before, lowercasing the title once per term.
+    reference = [any(term.lower() in title.lower() for term in terms) for title in titles]
+    latency = (perf_counter() - start_t) / number_of_titles
+    print(f"{'lowercase loop':<22}{latency * 1e6:>10.1f}{sum(reference):>9}{1:>11.1%}")
+    for name, word_boundaries in (('regex', False), ('regex, whole words', True)):
+        start_t = perf_counter()
+        matcher = NegateMatcher(terms, word_boundaries)
+        compile_time = perf_counter() - start_t
+        start_t = perf_counter()
+        negated = [matcher.match(title) is not None for title in titles]
+        latency = (perf_counter() - start_t) / number_of_titles
+        agreement = mean([a == b for a, b in zip(negated, reference)])
+        print(f"{name:<22}{latency * 1e6:>10.1f}{sum(negated):>9}{agreement:>11.1%}"
+              f"  compiled in {compile_time * 1e3:.0f} ms")
+    return None
+
+
+def pool_report(pool_sizes: List[int], number_of_jobs: int, latency: float) -> None:
+    server, site = _serve_fake_site(latency)
+    cwd = getcwd()
+    print(f"Applying to {number_of_jobs} jobs on a local site with {latency * 1e3:.0f} ms "
+          f"page latency and shortened pacing.")
+    print(f"{'workers':<10}{'applied':>9}{'s':>9}{'jobs/hour':>11}{'speedup':>9}")
+    try:
+        with TemporaryDirectory() as directory:
+            # Keeps the crawler's job store, checkpoint and answer cache out of the project.
+            chdir(directory)
+            baseline = 0.0
+            for number_of_workers in pool_sizes:
+                applied, elapsed = _apply_on_fake_site(
+                    site, number_of_workers, number_of_jobs, str(number_of_workers))
+                rate = applied / elapsed * 3600
+                baseline = baseline or rate / number_of_workers
+                print(f"{number_of_workers:<10}{applied:>9}{elapsed:>9.1f}{rate:>11.0f}"
+                      f"{rate / baseline if baseline else 0:>9.2f}")
+    finally:
+        chdir(cwd)
+        server.shutdown()
+    return None
+
+
+def quantization_report(model_file: str, stores: List[str], q_and_a_file: str) -> None:
+    questions, labels = _load_questions(q_and_a_file)
+    sentences = array(questions, dtype=str)
+    model = load_model(model_file)
+    reference = normalize(vectorize(
+        model.get_sentence_vector, otypes=[float32], signature='()->(n)')(sentences))
+    reference_nearest, _ = _leave_one_out(reference, None, reference)
+    encoders = [(path.basename(model_file), path.getsize(model_file), reference)]
+    for store in stores:
+        word_vectors = WordVectors(store)
+        size = sum(path.getsize(path.join(store, file_name))
+                   for file_name in ('vectors.npy', 'scales.npy')
+                   if path.exists(path.join(store, file_name)))
+        encoders.append((path.basename(store), size, normalize(vectorize(
+            word_vectors.get_sentence_vector, otypes=[float32], signature='()->(n)')(sentences))))
+    print(f"{len(questions)} questions from {q_and_a_file}, compared with the float32 "
+          f"{path.basename(model_file)} path.")
+    print(f"{'word vectors':<28}{'MB':>9}{'bank':>9}{'bank KB':>9}{'us/lookup':>11}"
+          f"{'question':>10}{'answer':>8}")
+    for name, size, queries in encoders:
+        for dtype in dtypes:
+            values, scales = quantize(queries, dtype)
+            nearest, latency = _leave_one_out(values, scales, queries)
+            bank_size = values.nbytes + (0 if scales is None else scales.nbytes)
+            same_question = mean([a == b for a, b in zip(nearest, reference_nearest)])
+            same_answer = mean([labels[a] == labels[b] for a, b in zip(nearest, reference_nearest)])
+            print(f"{name:<28}{size / 1e6:>9.1f}{dtype:>9}{bank_size / 1e3:>9.1f}"
+                  f"{latency * 1e6:>11.1f}{same_question:>10.1%}{same_answer:>8.1%}")
+    return None
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmarks for the crawler.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    quantization_parser = subparsers.add_parser(
+        'quantization', help='top-1 answer agreement of quantized embeddings')
+    quantization_parser.add_argument('stores', nargs='*', help='word vector store directories')
+    quantization_parser.add_argument('--model', default='fasttext-model/cc.en.300.bin')
+    quantization_parser.add_argument('--q-and-a', default='q_and_a.json')
+    encoder_parser = subparsers.add_parser(
+        'encoder', help='batch sentence encoder against numpy.vectorize')
+    encoder_parser.add_argument('store', nargs='?', default='fasttext-model/cc.en.300.compact')
+    encoder_parser.add_argument('--model', default='fasttext-model/cc.en.300.bin')
+    encoder_parser.add_argument('--q-and-a', default='q_and_a.json')
+    encoder_parser.add_argument('--repeat', type=int, default=5)
+    ann_parser = subparsers.add_parser('ann', help='IVF index recall and latency against exact search')
+    ann_parser.add_argument('--size', type=int, default=50000, help='synthetic bank size')
+    ann_parser.add_argument('--dim', type=int, default=300)
+    ann_parser.add_argument('--queries', type=int, default=1000)
+    ann_parser.add_argument('--knowledge-base', default='',
+                            help='compiled knowledge base directory to use instead of synthetic data')
+    blocking_parser = subparsers.add_parser(
+        'blocking', help='requests and bytes saved by blocking profiles on a local fake site')
+    blocking_parser.add_argument('--jobs', type=int, default=6)
+    blocking_parser.add_argument('--latency', type=float, default=0.2, help='seconds per page')
+    negate_parser = subparsers.add_parser(
+        'negate', help='compiled negate list matcher against the per-term loop')
+    negate_parser.add_argument('--terms', type=int, default=500)
+    negate_parser.add_argument('--titles', type=int, default=20000)
+    pool_parser = subparsers.add_parser(
+        'pool', help='application throughput of the worker pool against a local fake site')
+    pool_parser.add_argument('workers', nargs='*', type=int, default=[1, 2, 4],
+                             help='pool sizes to compare')
+    pool_parser.add_argument('--jobs', type=int, default=12)
+    pool_parser.add_argument('--latency', type=float, default=0.2, help='seconds per page')
+    parsed = parser.parse_args()
+    if parsed.benchmark == 'ann':
+        ann_report(parsed.size, parsed.dim, parsed.queries, parsed.knowledge_base)
+    elif parsed.benchmark == 'blocking':
+        blocking_report(parsed.jobs, parsed.latency)
+    elif parsed.benchmark == 'encoder':
+        encoder_report(parsed.model, parsed.store, parsed.q_and_a, parsed.repeat)
+    elif parsed.benchmark == 'negate':
+        negate_report(parsed.terms, parsed.titles)
+    elif parsed.benchmark == 'pool':
+        pool_report(parsed.workers, parsed.jobs, parsed.latency)
+    elif parsed.benchmark == 'quantization':
+        quantization_report(parsed.model, parsed.stores, parsed.q_and_a)
@@ -0,0 +1,31 @@
+from os import kill, path, readlink, remove
+from socket import gethostname
+
+
+def profile_in_use(profile_dir: str) -> bool:
+    """
+    Whether a running Chrome holds the user data directory, in which case a
+    second Chrome cannot be started on it. Locks left behind by a crash do
+    not count.
+    """
+    # Linux and macOS: a symlink to "<host>-<pid>" of the Chrome that owns the profile.
+    lock = path.join(profile_dir, 'SingletonLock')
+    if path.islink(lock):
+        host, _, pid = readlink(lock).rpartition('-')
+        if host != gethostname():
+            return True
+        try:
+            kill(int(pid), 0)
+        except (ProcessLookupError, ValueError):
+            return False
+        except PermissionError:
+            pass
+        return True
+    # Windows: a file Chrome keeps open, which cannot be removed until it exits.
+    lock = path.join(profile_dir, 'lockfile')
+    if path.exists(lock):
+        try:
+            remove(lock)
+        except OSError:
+            return True
+    return False
@@ -0,0 +1,51 @@
+from json import dump as dump_json, load as load_json
+from os import path, replace
+from typing import Dict
+
+
+class Checkpoint:
+    """
+    Progress of a crawl run: for every (region, query) search, the results
+    page offset, the number of jobs applied to and whether it is finished.
+    Saved after every results page, application and finished search so
+    that an interrupted run can continue where it stopped.
+    """
+
+    def __init__(self, file_name: str = 'checkpoint.json'):
+        self.total_jobs_applied_to = 0
+        self._file_name = file_name
+        self._run = ''
+        self._searches: Dict[str, Dict] = {}
+
+    def begin(self, run: str, resume: bool) -> bool:
+        """
+        :param run: key of the run settings; a checkpoint of other settings is never resumed
+        :param resume: continue from the saved checkpoint instead of starting over
+        :return: whether a saved checkpoint was resumed
+        """
+        self.total_jobs_applied_to = 0
+        self._run = run
+        self._searches = {}
+        if (not resume) or (not path.exists(self._file_name)):
+            return False
+        with open(self._file_name) as f:
+            stored = load_json(f)
+        if stored.get('run') != run:
+            return False
+        self.total_jobs_applied_to = stored['total_jobs_applied_to']
+        self._searches = stored['searches']
+        return True
+
+    def save(self) -> None:
+        with open(f"{self._file_name}.tmp", 'w') as f:
+            dump_json({'run': self._run, 'searches': self._searches,
+                       'total_jobs_applied_to': self.total_jobs_applied_to}, f)
+        replace(f"{self._file_name}.tmp", self._file_name)
+        return None
+
+    def search(self, location: str, country: str, query: str) -> Dict:
+        """
+        :return: mutable progress of one search, with the keys applied, done and start
+        """
+        return self._searches.setdefault(
+            '\x1f'.join([location, country, query]), {'applied': 0, 'done': False, 'start': 0})
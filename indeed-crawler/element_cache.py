@@ -0,0 +1,46 @@
+from typing import Any, Callable, Dict
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+
+class ElementCache:
+    """
+    WebElement handles of one browser, keyed by XPath within the current DOM
+    generation. The generation is advanced whenever the page is replaced,
+    which drops every handle, and a handle that went stale in between is
+    looked up again, so each element costs one lookup per page.
+    """
+
+    def __init__(self, browser: WebDriver):
+        self.generation = 0
+        self.hits = 0
+        self.lookups = 0
+        self._browser = browser
+        self._handles: Dict[str, WebElement] = {}
+
+    def find(self, xpath: str) -> WebElement:
+        handle = self._handles.get(xpath)
+        if handle is None:
+            self.lookups += 1
+            handle = self._handles[xpath] = self._browser.find_element(By.XPATH, xpath)
+        else:
+            self.hits += 1
+        return handle
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self._handles.clear()
+        return None
+
+    def run(self, xpath: str, action: Callable[[WebElement], Any]) -> Any:
+        """
+        Calls action with the element, looking it up again once if its handle is stale.
+        """
+        try:
+            return action(self.find(xpath))
+        except StaleElementReferenceException:
+            self._handles.pop(xpath, None)
+            return action(self.find(xpath))
@@ -1,129 +1,432 @@
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import copy
+from functools import partial
+from json import dump as dump_json, load as load_json
 from math import ceil
-from os import path
-from random import uniform
-from re import compile as compile_regex, findall
-from time import sleep, time
+from os import O_CREAT, O_TRUNC, O_WRONLY, chmod, makedirs, open as open_fd, path, replace
+from queue import Empty, Full, Queue
+from re import compile as compile_regex
+from threading import Condition, Event, Thread
+from time import perf_counter, time
 from tkinter import Text
 from traceback import format_exc
 from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import parse_qs, urlparse
 
-from bs4 import BeautifulSoup
-from bs4.element import Tag
 from fake_useragent import UserAgent
 from fasttext import load_model
-from numpy import apply_along_axis, argmin, array, char, float32, str_, vectorize
+from lxml.etree import XPath
+from lxml.html import HtmlElement
+from numpy import argmin, array, char, float32, str_, vectorize
 from numpy.typing import NDArray
-from pandas import DataFrame, ExcelWriter
-from scipy.spatial import distance
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import (
-    ElementNotInteractableException, NoSuchElementException, TimeoutException)
+    ElementNotInteractableException, NoSuchElementException, TimeoutException,
+    WebDriverException)
 from undetected_chromedriver import Chrome, ChromeOptions
 
+from answer_cache import AnswerCache
+from blocking import BlockingProfile
+from browser_profile import profile_in_use
+from checkpoint import Checkpoint
+from element_cache import ElementCache
+from job_cards import JobCardExtractor
+from job_store import JobStore, config_hash
+from knowledge_base import KnowledgeBase, normalize_text
+from negate_matcher import NegateMatcher
+from pacing import Pacer
+from page_snapshot import PageSnapshot, first
+from quantization import dot, normalize, quantize
+from typist import Typist
+from word_vectors import WordVectors
+
 
 class IndeedCrawler:
+    # Selectors and patterns are compiled once and reused for every page.
+    _quoted_regex = compile_regex('".+?"')
+    _xpath_apply_anyway = XPath('//span[contains(text(), "Apply anyway")]')
+    _xpath_input = XPath('.//input')
+    _xpath_label = XPath('.//label')
+    _xpath_legend = XPath('.//legend')
+    _xpath_option = XPath('.//option')
+    _xpath_questions = XPath('//*[contains(@class, "Questions-item")]')
+    _xpath_rich_text = XPath('.//span[@data-testid="rich-text"]')
+    _xpath_select = XPath('.//select')
+    _xpath_sibling_span = XPath('following-sibling::span[1]')
+    _xpath_textarea = XPath('.//textarea')
+    # Resolves once the DOM has not changed for arguments[0] ms, or after arguments[1] ms.
+    _quiescence_script = '''
+        const [quiet, limit, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+        const start = performance.now();
+        let last = start;
+        const observer = new MutationObserver(() => { last = performance.now(); });
+        observer.observe(
+            document, {attributes: true, childList: true, characterData: true, subtree: true});
+        (function check() {
+            const now = performance.now();
+            if ((now - last >= quiet) || (now - start >= limit)) {
+                observer.disconnect();
+                done(now - last >= quiet);
+            } else {
+                setTimeout(check, 50);
+            }
+        })();'''
 
     def __init__(self, total_number_of_jobs=0, q_and_a={}, log_box: Optional[Text] = None):
+        # Requests blocked in every browser of the crawler; None loads every page in full.
+        self.blocking_profile: Optional[BlockingProfile] = BlockingProfile()
+        # Jobs that discovery may read ahead of the applications.
+        self.candidate_queue_size = 10
+        # Extra Chrome command line switches, such as the host mapping of the benchmarks.
+        self.chrome_arguments: List[str] = []
         self.debug = False
+        # One of quantization.dtypes; smaller formats trade accuracy for memory.
+        self.embedding_dtype = 'float32'
         self.fidget_time = (0.5, 1.5)
-        self.page_load_time = (4, 2)
-        self.results = {'Title': [], 'Company': [], 'Location': [], 'Salary': [], 'URL': []}
+        # Answers longer than this are filled at once rather than typed; 0 fills every field.
+        self.instant_fill_length = 100
+        # Negate terms only match whole words, so "intern" no longer rejects "international".
+        self.negate_whole_words = False
+        # Browser sessions applying to jobs at the same time.
+        self.number_of_workers = 1
+        # Pause after a page is ready, scaled by the pacer to the observed page latency.
+        self.page_load_time = (1, 1)
+        # Longest wait for the DOM to settle, as spinners, carousels and timers never do.
+        self.quiet_limit = 2
+        # Seconds without DOM changes after which a loaded page counts as rendered.
+        self.quiet_time = 0.5
+        # The application tab is replaced after this many jobs or this many bytes of JS heap.
+        self.tab_recycle_heap = 512 * 2 ** 20
+        self.tab_recycle_jobs = 20
         self.timeout_time = 10
         self.total_jobs_applied_to = 0
+        # Seconds before a skipped or failed job is evaluated again.
+        self.verdict_ttl = {'failed': 3 * 86400, 'rejected': 30 * 86400}
+        self._answer_cache = AnswerCache()
+        # Tab that is navigated from job to job, next to the pinned main window.
+        self._application_jobs = 0
+        self._application_window = ''
         self._browser: Chrome
-        self._cache = set()
+        # Plain text cache of earlier versions, imported into the job store once.
         self._cache_file_name = 'cache.txt'
-        self._df = DataFrame()
+        self._checkpoint = Checkpoint()
+        # Copy of the crawler with its own browser that reads the results pages.
+        self._discoverer: Optional[IndeedCrawler] = None
+        # Element handles of the current page of the browser.
+        self._elements: ElementCache
+        # File that identifies the embeddings the knowledge base was built with.
+        self._embedding_file = ''
+        # Resolves once the embedding model and knowledge base are loaded.
+        self._embeddings: Optional[Future] = None
+        # Applications in progress across the worker pool.
+        self._in_flight = 0
+        self._job_cards = JobCardExtractor()
+        self._job_store = JobStore()
+        self._knowledge_base = KnowledgeBase()
         self._log_box = log_box
         self._main_window = ''
+        # Exact, normalized and token set answer lookups tried before the embedding search.
+        self._match_tiers: List[Tuple[str, Callable[[str], object], Dict[object, str]]] = [
+            ('exact', str, {}),
+            ('normalized', normalize_text, {}),
+            ('token set', lambda question: frozenset(normalize_text(question).split()), {})]
         self._map_country = {'canada': 'ca.', 'france': 'fr.', 'india': 'in.', 'ireland': 'ie.',
             'netherlands': 'nl.', 'united states': '', 'united kingdom': 'uk.'}
+        self._model_file = 'fasttext-model/cc.en.300.bin'
+        # Every browser session paces itself.
+        self._pacer = Pacer()
+        # Guards the counters, stores and checkpoint the worker pool shares, and is
+        # notified whenever an application in flight ends.
+        self._pool_lock = Condition()
+        # Chrome user data directory, kept between runs for its cookies and HTTP cache;
+        # a temporary one is used if empty or held by another crawler process.
+        self._profile_dir = path.join('browser-profiles', 'main')
+        self._profiles_dir = 'browser-profiles'
         self._q_and_a: Dict[str, Set[str]] = q_and_a
-        # Sentence to vector model must be loaded from fasttext binary.
+        self._q_and_a_file = 'q_and_a.json'
+        # Sentence to vector model must be loaded from the compact store or fasttext binary.
         self._sentence2vec: Callable[[NDArray[str_]], NDArray[float32]] = None
+        # Cookies of the signed in session, handed to every worker browser.
+        self._session_cookies: List[Dict] = []
+        # The session cookies saved at the last sign in, restored by the next run.
+        self._session_file = path.join(self._profiles_dir, 'session.json')
+        # Workbook of earlier versions, imported into the job store once.
         self._submissions_doc = 'submissions.xlsx'
+        self._tier_hits = Counter()
         self._total_number_of_jobs = total_number_of_jobs
-        if path.exists(self._cache_file_name):
-            with open(self._cache_file_name) as f:
-                for line in f:
-                    self._cache.add(line)
+        # Typing speed and the number of keys sent per WebDriver call.
+        self._typist = Typist()
+        self._verdict_skips = 0
+        # Built once from the fasttext binary with "python word_vectors.py".
+        self._word_vectors_dir = 'fasttext-model/cc.en.300.compact'
+        # The crawler itself and copies of it with their own browsers.
+        self._workers: List[IndeedCrawler] = [self]
+        for question, answer in q_and_a.items():
+            for _, key, answers in self._match_tiers:
+                # The first question wins when several reduce to the same key.
+                question_key = key(question)
+                if question_key:
+                    answers.setdefault(question_key, answer)
+        imported = self._job_store.import_cache(self._cache_file_name)
+        if imported:
+            self._log(f"Imported {imported} applied jobs from {self._cache_file_name}.")
+        imported = self._job_store.import_submissions(self._submissions_doc)
+        if imported:
+            self._log(f"Imported {imported} submissions from {self._submissions_doc}.")
 
     def setup_browser(self) -> None:
         options = ChromeOptions()
         options.add_argument('--disable-popup-blocking')
+        for argument in self.chrome_arguments:
+            options.add_argument(argument)
+        if self._profile_dir and profile_in_use(self._profile_dir):
+            # Another crawler process on this machine runs on it, and Chrome cannot share it.
+            self._log(f"{self._profile_dir} is in use; starting with a temporary profile.")
+        elif self._profile_dir:
+            options.add_argument(f"--user-data-dir={path.abspath(self._profile_dir)}")
         user_agent = UserAgent()
         options.add_argument(f"user-agent={user_agent.random}")
+        # Leaving a half filled application in the reused tab raises a "Leave site?" prompt.
+        options.set_capability('unhandledPromptBehavior', 'accept')
+        if self.blocking_profile:
+            # Blocked and loaded requests are counted from the performance log.
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
         self._browser = Chrome(options)
+        if self.blocking_profile:
+            self.blocking_profile.apply(self._browser)
+        self._application_window = ''
+        self._browser.set_script_timeout(self.timeout_time + 5)
+        self._elements = ElementCache(self._browser)
         return None
 
     def start_crawling(self, company_negate_list: List[str], job_negate_list: List[str],
-            queries: List[str], regions: List[Tuple[str]]) -> None:
+            queries: List[str], regions: List[Tuple[str]], resume: bool = False) -> None:
+        """
+        :param resume: continue the last run with the same searches where it stopped
+        """
         start_t = time()
+        # Searches run in a fixed order so that a checkpoint can be resumed.
+        queries, regions = sorted(queries), sorted(regions)
+        run = config_hash(queries, regions, self._total_number_of_jobs)
+        if self._checkpoint.begin(run, resume):
+            self.total_jobs_applied_to = self._checkpoint.total_jobs_applied_to
+            self._log(f"Resuming the last run after {self.total_jobs_applied_to} applications.")
         self.setup_browser()
-        self.login('', '')
+        # fasttext holds the GIL while it loads, which stalls every WebDriver call, so the
+        # model only starts loading once the browser shows the profile or sign in page.
+        self.login('', '', on_page=self._preload_embeddings)
+        self._start_workers()
+        self._start_discovery()
+        # Compiled once, as every card of every search is screened against them.
+        company_negate = NegateMatcher(company_negate_list, self.negate_whole_words)
+        job_negate = NegateMatcher(job_negate_list, self.negate_whole_words)
         jobs_per_query = ceil(self._total_number_of_jobs // (len(queries) * len(regions)))
         for location, country in regions:
             for query in queries:
+                if self._checkpoint.search(location, country, query)['done']:
+                    continue
                 try:
                     self._search_jobs(country, location, jobs_per_query, query,
-                        job_negate_list=job_negate_list, company_negate_list=company_negate_list)
+                        job_negate=job_negate, company_negate=company_negate)
                 except Exception:
                     self._log(format_exc(), traceback=True)
-        if self.results:
-            df = DataFrame(data=self.results)
-            if path.exists(self._submissions_doc):
-                with ExcelWriter(self._submissions_doc, engine='openpyxl',mode='a',
-                                 if_sheet_exists='overlay') as writer:
-                    df.to_excel(writer, sheet_name='jobs', header=False, index=False,
-                                startrow=writer.sheets['jobs'].max_row)
-            else:
-                df.to_excel(self._submissions_doc, sheet_name='jobs', index=False)
+                else:
+                    # Searches that raised are tried again when the run is resumed.
+                    self._checkpoint.search(location, country, query)['done'] = True
+                    self._checkpoint.save()
+        for crawler in self._workers + [self._discoverer]:
+            crawler._collect_network()
+        # Cookies refreshed during the run are kept for the next one.
+        self._save_session()
+        self._discoverer._browser.quit()
+        self._stop_workers()
         total_t = int(time() - start_t)
         seconds = total_t % 60
         minutes = (total_t % 3600) // 60
         hours = (total_t % 86400) // 3600
         days = total_t // 86400
         self._log('Job search has terminated.')
-        self._log(f"Applied to {self.total_jobs_applied_to} jobs.")
+        self._log(f"Applied to {self.total_jobs_applied_to} jobs. "
+                  f"Use Export Results to write them to {self._submissions_doc}.")
+        tiers = [tier for tier, _, _ in self._match_tiers] + ['cache', 'embedding']
+        self._log(f"Answers by match tier: "
+                  f"{', '.join(f'{tier} {self._tier_hits[tier]}' for tier in tiers)}.")
+        lookups = self._answer_cache.hits + self._answer_cache.misses
+        self._log(f"Answer cache: {self._answer_cache.hits} of {lookups} embedding searches saved.")
+        self._log(f"Results pages read from embedded JSON: {self._job_cards.path_counts['json']}, "
+                  f"from markup: {self._job_cards.path_counts['dom']}.")
+        self._answer_cache.save()
+        self._log(f"Skipped {self._verdict_skips} jobs rejected or failed on an earlier sighting.")
+        self._job_store.flush()
+        for i, worker in enumerate(self._workers):
+            self._log(f"Application browser {i + 1}: {worker._pacer.report()}; "
+                      f"{worker._elements.lookups} element lookups, "
+                      f"{worker._elements.hits} reused handles.")
+        self._log(f"Discovery browser: {self._discoverer._pacer.report()}.")
+        if self.blocking_profile:
+            self._log(f"Network: {self.blocking_profile.report()}.")
         self._log(f"Time elapsed: {days:02}:{hours:02}:{minutes:02}:{seconds:02}.")
         return None
 
-    def login(self, email: str, password: str) -> None:
-        self._browser.get('https://secure.indeed.com/account/login')
-        # Automated login is no longer possible on indeed.com.
-        self._log('You must manually sign in. After signing in, navigate to your profile page.')
-        WebDriverWait(self._browser, 600).until(
-            lambda driver: 'https://profile.indeed.com/' in driver.current_url)
+    def login(self, email: str, password: str,
+            on_page: Callable[[], None] = lambda: None) -> None:
+        """
+        :param on_page: called once the browser shows the profile or sign in page
+        """
+        self._restore_session()
+        if self._session_valid():
+            on_page()
+            self._log('Signed in with the session of the last run.')
+        else:
+            self._browser.get('https://secure.indeed.com/account/login')
+            on_page()
+            # Automated login is no longer possible on indeed.com.
+            self._log('You must manually sign in. After signing in, navigate to your profile page.')
+            WebDriverWait(self._browser, 600).until(
+                lambda driver: 'https://profile.indeed.com/' in driver.current_url)
+        self._save_session()
+        return None
+
+    def _apply_candidates(self, candidates: Queue, stop: Event, progress: Dict,
+            number_of_jobs: int, query: str, region: str, pending: Counter) -> None:
+        """
+        Applies to the queued jobs with every worker of the pool at once.
+        :param pending: number of queued or unfinished jobs by the offset of their results page
+        :raise: the first exception that ended discovery or a worker
+        """
+        errors: List[Exception] = []
+        threads = [Thread(target=self._apply_jobs, args=(
+            worker, candidates, stop, progress, number_of_jobs, query, region, pending, errors))
+            for worker in self._workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        if not self._workers:
+            raise RuntimeError('Every worker browser stopped.')
+        return None
+
+    def _apply_jobs(self, worker: 'IndeedCrawler', candidates: Queue, stop: Event,
+            progress: Dict, number_of_jobs: int, query: str, region: str, pending: Counter,
+            errors: List[Exception]) -> None:
+        """
+        Application loop of one worker, run in its own thread. A slot is
+        reserved before each application so the pool never goes past the
+        quota, and a crash only costs the worker its current job.
+        """
+        while not stop.is_set():
+            try:
+                candidate = candidates.get(timeout=1)
+            except Empty:
+                continue
+            if candidate is None:
+                # Passed on, so that every worker finishes the jobs it holds and then stops.
+                candidates.put(None)
+                break
+            if isinstance(candidate, Exception):
+                errors.append(candidate)
+                stop.set()
+                break
+            job_jk, job_url = candidate['jk'], candidate['url']
+            # Another worker or crawler process may have applied since discovery.
+            if job_jk in self._job_store:
+                with self._pool_lock:
+                    self._settle_candidate(candidate, progress, pending)
+                continue
+            with self._pool_lock:
+                # Reserved slots may yet be freed by failed applications, so the job is held
+                # until the applications in flight end.
+                while (progress['applied'] + self._in_flight >= number_of_jobs) and (
+                        progress['applied'] < number_of_jobs) and (not stop.is_set()):
+                    self._pool_lock.wait(timeout=1)
+                if (progress['applied'] >= number_of_jobs) or stop.is_set():
+                    stop.set()
+                    break
+                self._in_flight += 1
+            retired = False
+            try:
+                applied = worker._apply_to_job(job_url)
+            except WebDriverException:
+                # The browser crashed or hung; only its current job is given up.
+                self._log(format_exc(), traceback=True)
+                applied = False
+                try:
+                    self._restart_worker(worker)
+                except Exception:
+                    self._log(format_exc(), traceback=True)
+                    retired = True
+            except Exception as e:
+                # A fault of the crawler rather than of the job, such as a model that did not
+                # load, would fail every job alike, so no verdict is recorded and the run stops.
+                with self._pool_lock:
+                    self._in_flight -= 1
+                    self._pool_lock.notify_all()
+                errors.append(e)
+                stop.set()
+                break
+            with self._pool_lock:
+                self._in_flight -= 1
+                self._pool_lock.notify_all()
+                if applied:
+                    # Recorded straight away, so a crash loses nothing.
+                    self._job_store.add_submission(job_jk, candidate['title'],
+                        candidate['company'], candidate['location'], candidate['salary'], job_url)
+                    self._cache_job(job_jk, query, region)
+                    progress['applied'] += 1
+                    self.total_jobs_applied_to += 1
+                    self._log(f"You've applied to {self.total_jobs_applied_to} job(s).")
+                else:
+                    self._log(f"FAILURE - did not apply to job {job_url}")
+                    # Failures do not depend on the filters.
+                    self._cache_verdict(job_jk, 'failed', 'application not submitted')
+                    if self.debug:
+                        error_msg = f"{self.__class__.__name__}.debug is set to {self.debug}"
+                        self._log(error_msg)
+                        errors.append(ValueError(error_msg))
+                        stop.set()
+                self._settle_candidate(candidate, progress, pending)
+                if progress['applied'] >= number_of_jobs:
+                    stop.set()
+            if retired:
+                self._log(f"A worker browser could not be restarted; {worker._profile_dir} stopped.")
+                with self._pool_lock:
+                    # Later searches go on without it.
+                    self._workers.remove(worker)
+                break
         return None
 
     def _apply_to_job(self, job_url: str) -> bool:
         self._log(f"Applying to job at {job_url}.")
+        self._open_application_tab()
         prev_url = self._browser.current_url
-        self._browser.execute_script(f"window.open('{job_url}', '_blank');")
-        self._browser.switch_to.window(self._browser.window_handles[-1])
+        self._browser.get(job_url)
         self._wait_for_new_page(prev_url)
         self._click_button(
             self._browser.current_url, '//button//span[contains(text(), "Apply")]')
         if self._browser.current_url == job_url:
             self._log(f"Cannot apply to job: no apply button.")
-            self._browser.close()
-            self._browser.switch_to.window(self._main_window)
+            self._release_application_tab()
             return False
         retries = 0
         while True:
-            for tag in BeautifulSoup(self._browser.page_source, 'lxml').find_all(
-                    class_=compile_regex('Questions-item')):
+            # One snapshot per form page serves both lookups below.
+            snapshot = PageSnapshot(self._browser)
+            # Every question on the page is answered before any input is touched.
+            tags, questions = [], []
+            for tag in snapshot.find_all(self._xpath_questions):
                 question = self._find_question(tag)
-                if not question:
-                    continue
-                answer = self._df.loc[
-                    argmin(self._cosine_distance(self._df['Question'], question)), 'Answer']
+                if question:
+                    tags.append(tag)
+                    questions.append(question)
+            for tag, answer in zip(tags, self._find_answers(questions)):
                 self._log(f"Answer found: {answer}.")
                 self._input_answer(answer, tag)
-            if BeautifulSoup(self._browser.page_source, 'lxml').find(
-                    'span', string=compile_regex('Apply anyway')):
+            if snapshot.find(self._xpath_apply_anyway) is not None:
                 # Applies to job even if not qualified.
                 self._click_button(
                     self._browser.current_url, '//button//span[contains(text(), "Apply anyway")]')
@@ -146,14 +449,18 @@ class IndeedCrawler:
                 self._sleep(*self.page_load_time)
                 bool_val = True
                 self._log(f"SUCCESS - applied to job {job_url}")
-        self._browser.close()
-        self._browser.switch_to.window(self._main_window)
+        self._answer_cache.save()
+        self._release_application_tab()
         return bool_val
 
-    def _cache_job(self, job_jk: str) -> None:
-        self._cache.add(job_jk)
-        with open(self._cache_file_name, 'a') as file:
-            file.write(f"{job_jk}\n")
+    def _cache_job(self, job_jk: str, query: str, region: str) -> None:
+        self._job_store.add(job_jk, query=query, region=region)
+        # Applications are too costly to repeat to leave them uncommitted.
+        self._job_store.flush()
+        return None
+
+    def _cache_verdict(self, job_jk: str, outcome: str, reason: str, filters: str = '') -> None:
+        self._job_store.add_verdict(job_jk, outcome, reason, self.verdict_ttl[outcome], filters)
         return None
 
     def _click_button(self, current_url: str, xpath: str) -> None:
@@ -161,45 +468,119 @@ class IndeedCrawler:
             self._wait_for_new_page(current_url)
         return None
 
+    def _collect_network(self) -> None:
+        # The performance log is drained often, as the browser buffers it until it is read.
+        if self.blocking_profile:
+            self.blocking_profile.collect(self._browser)
+        return None
+
     def _cosine_distance(self, v: NDArray[str_], s: str) -> NDArray[float32]:
-        return apply_along_axis(distance.cosine, 1, self._sentence2vec(v), self._sentence2vec(s))
-
-    def _find_question(self, tag: Tag) -> str:
-        question = tag.find('span', {'data-testid': 'rich-text'})
-        if question:
-            question = question.get_text()
-        elif tag.find('legend'):
-            question = tag.find('legend').get_text()
-        elif tag.find('label'):
-            question = tag.find('label').get_text()
+        values, scales = quantize(normalize(self._sentence2vec(v)), self.embedding_dtype)
+        return 1 - dot(values, scales, normalize(self._sentence2vec(s)))
+
+    def _discover_jobs(self, search_url: str, screen: Callable[[Dict], Optional[Dict]],
+            candidates: Queue, stop: Event, progress: Dict, pending: Counter) -> None:
+        """
+        Producer of the jobs to apply to, run in its own thread and browser.
+        The queue is bounded, so discovery pauses while it is full. None is
+        queued once the results run out, or the exception that ended discovery.
+        :param screen: returns the cleaned card of a job to apply to, or None
+        :param pending: counts the queued jobs by the offset of their results page
+        """
+        try:
+            self._browser.get(search_url)
+            self._elements.invalidate()
+            self._log(f"Waiting for job search page. If there is a captcha, fill it out now.")
+            start_t = perf_counter()
+            WebDriverWait(self._browser, 60).until(lambda driver: '&vjk=' in driver.current_url)
+            self._wait_for_render()
+            self._pacer.observe(perf_counter() - start_t)
+            self._sleep(*self.page_load_time)
+            queued = set()
+            while not stop.is_set():
+                # Indeed numbers results pages by the offset of their first job.
+                start = int(parse_qs(
+                    urlparse(self._browser.current_url).query).get('start', ['0'])[0])
+                for card in self._job_cards.extract(PageSnapshot(self._browser)):
+                    if card['jk'] in queued:
+                        continue
+                    candidate = screen(card)
+                    if candidate is None:
+                        continue
+                    queued.add(candidate['jk'])
+                    candidate['start'] = start
+                    with self._pool_lock:
+                        pending[start] += 1
+                    if not self._offer_candidate(candidate, candidates, stop):
+                        return None
+                with self._pool_lock:
+                    # Resuming reopens the earliest page with a job not yet finished. The
+                    # checkpoint is saved directly, as this copy's applied count is stale.
+                    progress['start'] = min(+pending, default=start)
+                    self._checkpoint.save()
+                self._collect_network()
+                prev_url = self._browser.current_url
+                if not self._move_to_and_click('//nav//a[@aria-label="Next Page"]'):
+                    self._log('Failed to click next page')
+                    break
+                self._wait_for_new_page(prev_url)
+        except Exception as e:
+            self._offer_candidate(e, candidates, stop)
+            return None
+        self._offer_candidate(None, candidates, stop)
+        return None
+
+    def _find_answers(self, questions: List[str]) -> List[str]:
+        answers: List[Optional[str]] = [None] * len(questions)
+        for i, question in enumerate(questions):
+            for tier, key, tier_answers in self._match_tiers:
+                answers[i] = tier_answers.get(key(question))
+                if answers[i] is not None:
+                    self._tier_hits[tier] += 1
+                    break
+        unresolved = [i for i, answer in enumerate(answers) if answer is None]
+        if unresolved:
+            self._wait_for_embeddings()
+        for i in unresolved.copy():
+            answers[i] = self._answer_cache.get(questions[i])
+            if answers[i] is not None:
+                self._tier_hits['cache'] += 1
+                unresolved.remove(i)
+        if unresolved:
+            # One batched embedding and one matrix product for the rest of the page.
+            self._tier_hits['embedding'] += len(unresolved)
+            nearest = self._nearest_questions([questions[i] for i in unresolved])
+            for i, j in zip(unresolved, nearest):
+                answers[i] = self._knowledge_base.answers[j]
+                self._answer_cache.put(questions[i], answers[i])
+        return answers
+
+    def _find_question(self, tag: HtmlElement) -> str:
+        for selector in (self._xpath_rich_text, self._xpath_legend, self._xpath_label):
+            question = first(selector, tag)
+            if question is not None:
+                question = question.text_content()
+                break
         else:
             self._log(f"Question not found.")
             return ''
         # Some questions are wrapped in double quotes.
-        matches = findall('".+?"', question)
+        matches = self._quoted_regex.findall(question)
         if matches:
             question = max(matches, key=len).strip('"')
         self._log(f"Question found: {question}")
         return question
 
-    def _find_word_in_negate_list(self, string: str, negate_list: List[str]) -> bool:
-        for word in negate_list:
-            if word.lower() in string.lower():
-                self._log(f"Found {word} in {string}.")
-                return True
-        return False
-
-    def _get_value(self, field: str, tag: Union[Tag, None]) -> str:
-        if not tag:
+    def _get_value(self, field: str, value: Optional[str]) -> str:
+        if not value:
             self._log(f"Failed to find {field}.")
             return ''
-        value = tag.get_text()
         self._log(f"{field}: {value}")
         return value
 
-    def _input_answer(self, answer: str, tag: Tag) -> None:
-        input_0 = tag.find('input')
-        if input_0:
+    def _input_answer(self, answer: str, tag: HtmlElement) -> None:
+        input_0 = first(self._xpath_input, tag)
+        if input_0 is not None:
             input_type = input_0.get('type')
             self._log(f"Input type found: {input_type}.")
             if ((not input_type) or (input_type == 'text')) and (not input_0.get('value')):
@@ -207,12 +588,12 @@ class IndeedCrawler:
                 self._move_to_and_send_keys(f'//input[@name="{identifier}"]', answer)
             elif (input_type == 'radio') or (input_type == 'checkbox'):
                 self._input_radio(answer, tag)
-        elif tag.find('select'):
+        elif first(self._xpath_select, tag) is not None:
             self._log(f"Input type found: selection.")
             self._input_selection(answer, tag)
-        elif tag.find('textarea'):
+        elif first(self._xpath_textarea, tag) is not None:
             self._log(f"Input type found: textarea.")
-            textarea = tag.find('textarea')
+            textarea = first(self._xpath_textarea, tag)
             if not textarea.get('value'):
                 identifier = textarea.get('name')
                 self._move_to_and_send_keys(f'//textarea[@name="{identifier}"]', answer)
@@ -220,39 +601,63 @@ class IndeedCrawler:
             self._log(f"Input type found: unknown.")
         return None
 
-    def _input_radio(self, answer: str, tag: Tag) -> None:
+    def _input_radio(self, answer: str, tag: HtmlElement) -> None:
         selections = set()
-        for input_i in tag.find_all('input'):
-            text = input_i.find_next_sibling('span').get_text()
+        for input_i in self._xpath_input(tag):
+            span = first(self._xpath_sibling_span, input_i)
+            text = '' if span is None else span.text_content()
             if text:
                 selections.add(text)
         answer = self._select_answer(answer, selections)
         identifier = input_i.get('name')
         xpath = f'//span[contains(text(), "{answer}")]/preceding::input[@name="{identifier}"][1]'
-        if not self._browser.find_element(By.XPATH, xpath).is_selected():
+        if not self._elements.run(xpath, lambda element: element.is_selected()):
             self._move_to_and_click(xpath)
         return None
 
-    def _input_selection(self, answer: str, tag: Tag) -> None:
+    def _input_selection(self, answer: str, tag: HtmlElement) -> None:
         selections = set()
-        for option_i in tag.find_all('option'):
+        for option_i in self._xpath_option(tag):
             if option_i.get('value'):
-                text = option_i.get_text()
+                text = option_i.text_content()
                 if text:
                     selections.add(text)
         answer = self._select_answer(answer, selections)
-        identifier = tag.find('select').get('name')
+        identifier = first(self._xpath_select, tag).get('name')
         xpath = f'//select[@name="{identifier}"]//option[contains(text(), "{answer}")]'
-        if not self._browser.find_element(By.XPATH, xpath).is_selected():
+        if not self._elements.run(xpath, lambda element: element.is_selected()):
             self._move_to_and_click(xpath)
         return None
 
+    def _load_embeddings(self) -> Callable[[NDArray[str_]], NDArray[float32]]:
+        """
+        :return: the sentence encoder, for the workers copied from the crawler before it loaded
+        """
+        self._load_s2v_model()
+        self._load_knowledge_base()
+        self._answer_cache.load(self._knowledge_base.key)
+        return self._sentence2vec
+
+    def _load_knowledge_base(self) -> None:
+        self._knowledge_base.dtype = self.embedding_dtype
+        embedded = self._knowledge_base.compile(
+            self._q_and_a, self._q_and_a_file, self._embedding_file, self._sentence2vec)
+        self._log(f"Q&A bank loaded: {len(self._knowledge_base.questions)} questions, "
+                  f"{embedded} embedded.")
+        return None
+
     def _load_s2v_model(self) -> None:
-        self._log('Loading fasttext pretrained sentence/document embedding model. '
-                  'This may take a few minutes.')
-        model = load_model('fasttext-model/cc.en.300.bin')
-        self._sentence2vec = vectorize(
-            model.get_sentence_vector, otypes=[float32], signature='()->(n)')
+        if path.exists(self._word_vectors_dir):
+            self._log('Loading compact word vectors.')
+            self._sentence2vec = WordVectors(self._word_vectors_dir).get_sentence_vectors
+            self._embedding_file = path.join(self._word_vectors_dir, 'vectors.npy')
+        else:
+            self._log('Loading fasttext pretrained sentence/document embedding model. '
+                      'This may take a few minutes.')
+            model = load_model(self._model_file)
+            self._sentence2vec = vectorize(
+                model.get_sentence_vector, otypes=[float32], signature='()->(n)')
+            self._embedding_file = self._model_file
         self._log('Model loaded successfully.')
         return None
 
@@ -268,134 +673,250 @@ class IndeedCrawler:
         return None
 
     def _move_to(self, xpath: str) -> None:
-        #  Finding the element before every action is
-        #  to avoid "StaleElementReferenceException".
-        self._browser.execute_script(
-            "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
-            self._browser.find_element(By.XPATH, xpath))
+        #  The element is looked up once per page and
+        #  again only on "StaleElementReferenceException".
+        self._elements.run(xpath, lambda element: self._browser.execute_script(
+            "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element))
         self._sleep(*self.fidget_time)
         try:
-            ActionChains(self._browser).move_to_element(
-                self._browser.find_element(By.XPATH, xpath)).perform()
+            self._elements.run(xpath, lambda element: ActionChains(self._browser).move_to_element(
+                element).perform())
             self._sleep(*self.fidget_time)
         except ElementNotInteractableException:
             pass
         return None
 
     def _move_to_and_click(self, xpath: str) -> bool:
-        #  Finding the element before every action is
-        #  to avoid "StaleElementReferenceException".
         try:
             self._move_to(xpath)
         except NoSuchElementException:
             self._log('Failed to click: NoSuchElementException')
             return False
-        self._browser.find_element(By.XPATH, xpath).click()
+        self._elements.run(xpath, lambda element: element.click())
         self._sleep(*self.fidget_time)
         return True
 
     def _move_to_and_send_keys(self, xpath: str, keys: str) -> None:
-        #  Finding the element before every action is
-        #  to avoid "StaleElementReferenceException".
+        # The click focuses the element, so the keys need no further lookup.
         if self._move_to_and_click(xpath):
-            for key_ in keys:
-                self._sleep(0, 0.25)  # Typing speed
-                self._browser.find_element(By.XPATH, xpath).send_keys(key_)
+            self._typist.type(self._browser, keys, instant=len(keys) > self.instant_fill_length)
             self._sleep(*self.fidget_time)
         return None
 
+    def _nearest_questions(self, questions: List[str]) -> List[int]:
+        return self._knowledge_base.nearest(
+            normalize(self._sentence2vec(array(questions, dtype=str))))
+
+    def _negated(self, string: str, matcher: NegateMatcher) -> bool:
+        term = matcher.match(string)
+        if term:
+            self._log(f"Found {term} in {string}.")
+        return term is not None
+
+    def _new_worker(self, number: int) -> 'IndeedCrawler':
+        # Shares every store and setting, and only replaces the browser.
+        worker = copy(self)
+        worker._pacer = Pacer()
+        worker._profile_dir = path.join(self._profiles_dir, f"worker-{number}")
+        self._open_worker_browser(worker)
+        return worker
+
+    def _offer_candidate(self, candidate: Union[Dict, Exception, None], candidates: Queue,
+            stop: Event) -> bool:
+        """
+        :return: False if the consumer stopped before the candidate was queued
+        """
+        while not stop.is_set():
+            try:
+                candidates.put(candidate, timeout=1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _open_application_tab(self) -> None:
+        if not self._application_window:
+            self._browser.switch_to.new_window('tab')
+            self._application_window = self._browser.current_window_handle
+            self._application_jobs = 0
+            if self.blocking_profile:
+                self.blocking_profile.apply(self._browser)
+        elif self._browser.current_window_handle != self._application_window:
+            self._browser.switch_to.window(self._application_window)
+        self._elements.invalidate()
+        return None
+
+    def _open_worker_browser(self, worker: 'IndeedCrawler') -> None:
+        worker.setup_browser()
+        # The signed in session is reused rather than signing in again.
+        if self._session_cookies:
+            worker._browser.execute_cdp_cmd('Network.setCookies', {'cookies': self._session_cookies})
+        worker._main_window = worker._browser.current_window_handle
+        return None
+
+    def _preload_embeddings(self) -> None:
+        executor = ThreadPoolExecutor(max_workers=1)
+        self._embeddings = executor.submit(self._load_embeddings)
+        executor.shutdown(wait=False)
+        return None
+
+    def _release_application_tab(self) -> None:
+        self._collect_network()
+        # A renderer is only torn down once it has served enough jobs or grown too large.
+        self._application_jobs += 1
+        heap = self._browser.execute_script(
+            'return performance.memory ? performance.memory.usedJSHeapSize : 0')
+        if (self._application_jobs >= self.tab_recycle_jobs) or (heap >= self.tab_recycle_heap):
+            self._log(f"Recycling the application tab after {self._application_jobs} jobs "
+                      f"and {heap / 2 ** 20:.0f} MB of JS heap.")
+            self._browser.close()
+            self._browser.switch_to.window(self._main_window)
+            self._application_window = ''
+            self._elements.invalidate()
+        return None
+
+    def _restart_worker(self, worker: 'IndeedCrawler') -> None:
+        self._log('Restarting a worker browser.')
+        try:
+            worker._browser.quit()
+        except Exception:
+            pass
+        self._open_worker_browser(worker)
+        return None
+
+    def _restore_session(self) -> None:
+        # Session cookies are not kept in the profile, and Chrome writes its cookie store lazily.
+        if path.exists(self._session_file):
+            with open(self._session_file) as f:
+                self._browser.execute_cdp_cmd('Network.setCookies', {'cookies': load_json(f)})
+        return None
+
+    def _save_checkpoint(self, progress: Dict, **values: int) -> None:
+        progress.update(values)
+        self._checkpoint.total_jobs_applied_to = self.total_jobs_applied_to
+        self._checkpoint.save()
+        return None
+
+    def _save_session(self) -> None:
+        # Only the fields Network.setCookies accepts are kept.
+        self._session_cookies = [
+            {key: value for key, value in cookie.items() if key in (
+                'domain', 'httpOnly', 'name', 'path', 'sameSite', 'secure', 'value')
+                or (key == 'expires' and not cookie.get('session'))}
+            for cookie in self._browser.execute_cdp_cmd('Network.getAllCookies', {})['cookies']]
+        # The cookies sign anyone who has them in, so only the owner may read the file.
+        makedirs(self._profiles_dir, exist_ok=True)
+        temp_file = f"{self._session_file}.tmp"
+        with open(open_fd(temp_file, O_WRONLY | O_CREAT | O_TRUNC, 0o600), 'w') as f:
+            dump_json(self._session_cookies, f)
+        chmod(temp_file, 0o600)
+        replace(temp_file, self._session_file)
+        return None
+
+    def _screen_card(self, card: Dict, filters: str, query: str, company_negate: NegateMatcher,
+            enforce_query: bool, enforce_salary: bool, job_negate: NegateMatcher,
+            min_salary: str) -> Optional[Dict]:
+        """
+        :return: the card with its values cleaned if the job is to be applied to
+        """
+        # Automation is limited to "Easy apply".
+        if not card['easy_apply']:
+            return None
+        job_jk = card['jk']
+        if not job_jk:
+            self._log('Failed to find data-jk value.')
+            return None
+        if job_jk in self._job_store:
+            self._log(f"Already applied to job: {job_jk}.")
+            return None
+        verdict = self._job_store.verdict(job_jk, filters)
+        if verdict:
+            self._log(f"Skipping job {job_jk}, {verdict[0]} earlier: {verdict[1]}.")
+            self._verdict_skips += 1
+            return None
+        title = self._get_value('Job Title', card['title'])
+        if enforce_query and ((query.lower() not in title.lower())
+                or (title.lower() not in query.lower())):
+            self._log(f"Title {title} does not match query {query}")
+            self._cache_verdict(job_jk, 'rejected', 'title does not match query', filters)
+            return None
+        if self._negated(title, job_negate):
+            self._cache_verdict(job_jk, 'rejected', 'job title negated', filters)
+            return None
+        company = self._get_value('Company Name', card['company'])
+        if self._negated(company, company_negate):
+            self._cache_verdict(job_jk, 'rejected', 'company negated', filters)
+            return None
+        salary = self._get_value('Salary', card['salary'])
+        if enforce_salary and (not salary):
+            self._log(f"Salary is enforced. Skipping job {job_jk}.")
+            self._cache_verdict(job_jk, 'rejected', 'no salary', filters)
+            return None
+        if min_salary and salary:
+            # Needs rewriting.
+            pass
+        location = self._get_value('Location', card['location'])
+        return {'jk': job_jk, 'title': title, 'company': company, 'salary': salary,
+                'location': location, 'url': f"https://www.indeed.com/viewjob?jk={job_jk}"}
+
     def _search_jobs(self, country: str, location: str, number_of_jobs: int, query: str,
-            company_negate_list: List[str] = [], enforce_salary: bool = False,
-            enforce_query: bool = False, exp_lvl: str = '', job_negate_list: List[str] = [],
-            job_type: str = '', min_salary: str = '', past_14_days: bool = False,
-            radius: str = '') -> None:
+            company_negate: NegateMatcher = NegateMatcher(()), enforce_salary: bool = False,
+            enforce_query: bool = False, exp_lvl: str = '',
+            job_negate: NegateMatcher = NegateMatcher(()), job_type: str = '',
+            min_salary: str = '', past_14_days: bool = False, radius: str = '') -> None:
         if not number_of_jobs:
             self._log('Number of jobs is zero.')
             return None
-        if not self._sentence2vec:
-            self._df = DataFrame(self._q_and_a.items(), columns=['Question', 'Answer'])
-            self._load_s2v_model()
-        self._browser.get(f"https://{self._map_country[country]}indeed.com/jobs?q={query}"
+        progress = self._checkpoint.search(location, country, query)
+        if progress['applied'] >= number_of_jobs:
+            return None
+        if not self._embeddings:
+            self._preload_embeddings()
+        start = str(progress['start'] or '')
+        search_url = (f"https://{self._map_country[country]}indeed.com/jobs?q={query}"
             f"{'&fromage=14' * past_14_days}{'&jt='*bool(job_type) + job_type}"
             f"{'&explvl='*bool(exp_lvl) + exp_lvl}{'&l='*bool(location) + location}"
-            f"{'&radius='*bool(radius) + radius}")
-        self._log(f"Waiting for job search page. If there is a captcha, fill it out now.")
-        WebDriverWait(self._browser, 60).until(lambda driver: '&vjk=' in driver.current_url)
-        self._sleep(*self.page_load_time)
-        batch_jobs_applied_to = 0
-        active_search = True
-        while active_search:
-            # Jobs are applied to in a separate tab.
-            self._main_window = self._browser.current_window_handle
-            for tag in BeautifulSoup(self._browser.page_source, 'lxml').find_all(
-                    'div', {'class': 'job_seen_beacon'}):
-                # Automation is limited to "Easy apply".
-                if not tag.find('span', string=compile_regex('Easily apply')):
-                    continue
-                job_jk = tag.find('a')
-                if job_jk:
-                    job_jk = job_jk.get('data-jk')
-                if not job_jk:
-                    self._log('Failed to find data-jk value.')
-                    continue
-                if job_jk in self._cache:
-                    self._log(f"Already applied to job: {job_jk}.")
-                    continue
-                title = self._get_value(
-                    'Job Title', tag.find('span', {'id': f"jobTitle-{job_jk}"}))
-                if enforce_query and ((query.lower() not in title.lower())
-                        or (title.lower() not in query.lower())):
-                    self._log(f"Title {title} does not match query {query}")
-                    continue
-                if self._find_word_in_negate_list(title, job_negate_list):
-                    continue
-                company = self._get_value(
-                    'Company Name', tag.find('span', {'data-testid': 'company-name'}))
-                if self._find_word_in_negate_list(company, company_negate_list):
-                    continue
-                salary = self._get_value(
-                    'Salary', tag.find(string=compile_regex('^\$?[0-9]{1,3},?[0-9]{0,3}.?[0-9]{0,2}')))
-                if enforce_salary and (not salary):
-                    self._log(f"Salary is enforced. Skipping job {job_jk}.")
-                    continue
-                if min_salary and salary:
-                    # Needs rewriting.
-                    pass
-                location = self._get_value(
-                    'Location', tag.find('div', {'data-testid': 'text-location'}))
-                job_url = f"https://www.indeed.com/viewjob?jk={job_jk}"
-                if self._apply_to_job(job_url):
-                    self._cache_job(job_jk)
-                    self.results['Title'].append(title)
-                    self.results['Company'].append(company)
-                    self.results['Location'].append(location)
-                    self.results['Salary'].append(salary)
-                    self.results['URL'].append(job_url)
-                    batch_jobs_applied_to += 1
-                    self.total_jobs_applied_to += 1
-                    self._log(f"You've applied to {self.total_jobs_applied_to} job(s).")
-                else:
-                    self._log(f"FAILURE - did not apply to job {job_url}")
-                    if self.debug:
-                        error_msg = f"{self.__class__.__name__}.debug is set to {self.debug}"
-                        self._log(error_msg)
-                        raise ValueError(error_msg)
-                if batch_jobs_applied_to == number_of_jobs:
-                    active_search = False
-                    break
-            try:
-                self._click_button(
-                    self._browser.current_url, '//nav//a[@aria-label="Next Page"]')
-            except NoSuchElementException:
-                self._log('Failed to click next page')
-                break
+            f"{'&radius='*bool(radius) + radius}{'&start='*bool(start) + start}")
+        # Rejections only hold for the filters they were made with.
+        filters = config_hash(company_negate.terms, job_negate.terms,
+            enforce_query and query.lower(), enforce_salary, min_salary,
+            company_negate.word_boundaries, job_negate.word_boundaries)
+        screen = partial(self._screen_card, filters=filters, query=query,
+            company_negate=company_negate, enforce_query=enforce_query,
+            enforce_salary=enforce_salary, job_negate=job_negate, min_salary=min_salary)
+        # Results pages are read ahead in the discovery browser while the pool applies.
+        candidates = Queue(maxsize=self.candidate_queue_size)
+        pending = Counter()
+        stop = Event()
+        if self._discoverer is None:
+            # Called directly rather than from start_crawling.
+            self._main_window = self._main_window or self._browser.current_window_handle
+            self._start_discovery()
+        discovery = Thread(target=self._discoverer._discover_jobs,
+                           args=(search_url, screen, candidates, stop, progress, pending),
+                           daemon=True)
+        discovery.start()
+        try:
+            self._apply_candidates(candidates, stop, progress, number_of_jobs, query,
+                                   f"{location}, {country}", pending)
+        finally:
+            stop.set()
+            discovery.join()
         return None
 
     def _select_answer(self, answer: str, selections: Set[str]) -> str:
+        # Text answers may come from a match tier before the model is loaded, and loading
+        # the answer cache replaces anything stored in it earlier.
+        self._wait_for_embeddings()
         select_array = array(list(selections), dtype='str')
         select_array = char.replace(select_array, '\n', '')
         self._log(f"Selections found: {selections}.")
-        answer = select_array[argmin(self._cosine_distance(select_array, answer))]
+        options = [str(option) for option in select_array]
+        selected = self._answer_cache.get(answer, options)
+        if selected is None:
+            selected = options[argmin(self._cosine_distance(select_array, answer))]
+            self._answer_cache.put(answer, selected, options)
+        answer = selected
         self._log(f"Answer selected: {answer}.")
         return answer
 
@@ -419,12 +940,87 @@ class IndeedCrawler:
                 break
         return False
 
-    def _sleep(self, seconds: int, rand_lim: int) -> None:
-        sleep(seconds + uniform(0, rand_lim))
+    def _session_valid(self) -> bool:
+        """
+        :return: whether the profile page opens without a redirect to the sign in page
+        """
+        self._browser.get('https://profile.indeed.com/')
+        try:
+            WebDriverWait(self._browser, self.timeout_time).until(
+                lambda driver: ('account/login' in driver.current_url) or (
+                    driver.current_url.startswith('https://profile.indeed.com/')
+                    and driver.execute_script('return document.readyState') == 'complete'))
+        except TimeoutException:
+            return False
+        return 'account/login' not in self._browser.current_url
+
+    def _settle_candidate(self, candidate: Dict, progress: Dict, pending: Counter) -> None:
+        # Called with the pool lock held, once a job is applied to, failed or skipped.
+        pending[candidate['start']] -= 1
+        # Resuming reopens the earliest page with a job not yet finished, so jobs still
+        # queued or in flight from earlier pages are not skipped.
+        self._save_checkpoint(progress, start=min(
+            +pending, default=max(progress['start'], candidate['start'])))
+        return None
+
+    def _sleep(self, seconds: float, rand_lim: float) -> None:
+        self._pacer.pause(seconds, rand_lim)
+        return None
+
+    def _start_discovery(self) -> None:
+        # Shares every store and setting, and only replaces the browser.
+        self._discoverer = copy(self)
+        self._discoverer._pacer = Pacer()
+        self._discoverer._profile_dir = path.join(self._profiles_dir, 'discovery')
+        self._open_worker_browser(self._discoverer)
+        return None
+
+    def _start_workers(self) -> None:
+        # Jobs are applied to in a separate tab.
+        self._main_window = self._browser.current_window_handle
+        self._workers = [self] + [self._new_worker(i) for i in range(1, self.number_of_workers)]
+        return None
+
+    def _stop_workers(self) -> None:
+        for worker in self._workers:
+            if worker is self:
+                continue
+            try:
+                worker._browser.quit()
+            except Exception:
+                pass
+        return None
+
+    def _wait_for_embeddings(self) -> None:
+        if not self._embeddings.done():
+            self._log('Waiting for the embedding model to finish loading.')
+        # Re-raises any exception from the loading thread.
+        self._sentence2vec = self._embeddings.result()
         return None
 
     def _wait_for_new_page(self, prev_url: str) -> None:
+        start_t = perf_counter()
         WebDriverWait(self._browser, self.timeout_time).until(
             lambda driver: prev_url != driver.current_url)
+        self._elements.invalidate()
+        self._wait_for_render()
+        self._pacer.observe(perf_counter() - start_t)
         self._sleep(*self.page_load_time)
         return None
+
+    def _wait_for_render(self) -> None:
+        try:
+            WebDriverWait(self._browser, self.timeout_time).until(
+                lambda driver: driver.execute_script('return document.readyState') == 'complete')
+        except TimeoutException:
+            # Slow third party resources do not keep the page from being used.
+            pass
+        # Pages keep rendering after they load, until the DOM settles.
+        try:
+            if not self._browser.execute_async_script(
+                    self._quiescence_script, self.quiet_time * 1000, self.quiet_limit * 1000):
+                self._pacer.render_limits += 1
+        except WebDriverException:
+            # A redirect unloads the document the script waits in; the page is taken as settled.
+            pass
+        return None
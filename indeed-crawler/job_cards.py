@@ -0,0 +1,86 @@
+from collections import Counter
+from json import JSONDecodeError, JSONDecoder
+from re import compile as compile_regex
+from typing import Dict, List, Optional
+
+from lxml.etree import XPath
+from lxml.html import HtmlElement
+
+from page_snapshot import PageSnapshot, first
+
+
+class JobCardExtractor:
+    """
+    Extracts the job cards of a search results page. The cards are read from
+    the JSON the page embeds for its own rendering when it is there, and from
+    the job_seen_beacon markup otherwise. Each card is a dict with the keys
+    jk, title, company, salary, location and easy_apply.
+    """
+    _json_marker = 'window.mosaic.providerData["mosaic-provider-jobcards"]'
+    _salary_regex = compile_regex(r'^\$?[0-9]{1,3},?[0-9]{0,3}.?[0-9]{0,2}')
+    _xpath_anchor = XPath('(.//a)[1]')
+    _xpath_company = XPath('.//span[@data-testid="company-name"]')
+    _xpath_easily_apply = XPath('.//span[contains(text(), "Easily apply")]')
+    _xpath_job_cards = XPath(
+        '//div[contains(concat(" ", normalize-space(@class), " "), " job_seen_beacon ")]')
+    _xpath_job_title = XPath('.//span[@id=$id]')
+    _xpath_location = XPath('.//div[@data-testid="text-location"]')
+    _xpath_text = XPath('.//text()')
+
+    def __init__(self):
+        # Number of pages extracted through each path.
+        self.path_counts = Counter()
+
+    def extract(self, snapshot: PageSnapshot) -> List[Dict]:
+        cards = self._from_json(snapshot.source)
+        if cards is None:
+            self.path_counts['dom'] += 1
+            return self._from_dom(snapshot)
+        self.path_counts['json'] += 1
+        return cards
+
+    def _from_dom(self, snapshot: PageSnapshot) -> List[Dict]:
+        cards = []
+        for tag in snapshot.find_all(self._xpath_job_cards):
+            anchor = first(self._xpath_anchor, tag)
+            jk = None if anchor is None else anchor.get('data-jk')
+            cards.append({
+                'jk': jk,
+                'title': self._text(first(self._xpath_job_title, tag, id=f"jobTitle-{jk}")),
+                'company': self._text(first(self._xpath_company, tag)),
+                'salary': next(
+                    (text for text in self._xpath_text(tag) if self._salary_regex.search(text)), None),
+                'location': self._text(first(self._xpath_location, tag)),
+                'easy_apply': first(self._xpath_easily_apply, tag) is not None})
+        return cards
+
+    def _from_json(self, source: str) -> Optional[List[Dict]]:
+        start = source.find(self._json_marker)
+        if start < 0:
+            return None
+        start = source.find('{', start + len(self._json_marker))
+        try:
+            # raw_decode stops at the end of the object, whatever script follows it.
+            data, _ = JSONDecoder().raw_decode(source, start)
+            results = data['metaData']['mosaicProviderJobCardsModel']['results']
+        except (JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+        if (not isinstance(results, list)) or (
+                not all(isinstance(result, dict) for result in results)):
+            return None
+        cards = []
+        for result in results:
+            salary = (result.get('salarySnippet') or {}).get('text') or None
+            cards.append({
+                'jk': result.get('jobkey'),
+                'title': result.get('displayTitle') or result.get('title'),
+                'company': result.get('company'),
+                'salary': salary,
+                'location': result.get('formattedLocation'),
+                'easy_apply': bool(result.get('indeedApplyEnabled')
+                                   or result.get('indeedApplyable'))})
+        return cards
+
+    @staticmethod
+    def _text(element: Optional[HtmlElement]) -> Optional[str]:
+        return None if element is None else element.text_content()
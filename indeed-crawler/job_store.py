@@ -0,0 +1,208 @@
+from hashlib import sha256
+from json import dumps
+from os import path, replace
+from sqlite3 import connect
+from threading import Lock
+from time import time
+from typing import Dict, Optional, Set, Tuple
+
+from pandas import read_excel, read_sql_query
+
+
+def config_hash(*values) -> str:
+    """
+    :param values: JSON serializable settings a verdict depends on
+    """
+    return sha256(dumps(values).encode()).hexdigest()[:16]
+
+
+class JobStore:
+    """
+    SQLite record of the jobs the crawler has handled, one row per job key.
+    The database runs in WAL mode so several crawler processes can share it:
+    readers never block and writers wait for each other instead of failing.
+    Applied job keys are also held in memory for constant time lookups.
+    Jobs that were skipped or failed get a verdict that expires after a TTL,
+    so they are not evaluated again until then. Submissions are appended as
+    they happen and exported to Excel on demand.
+    """
+
+    def __init__(self, file_name: str = 'jobs.db', batch_size: int = 20):
+        self._applied: Set[str] = set()
+        self._batch_size = batch_size
+        # The store is created on the GUI thread and used by the crawler thread.
+        self._connection = connect(file_name, timeout=30, check_same_thread=False)
+        self._lock = Lock()
+        self._pending = 0
+        # Job key to outcome, reason, config hash and expiry time.
+        self._verdicts: Dict[str, Tuple[str, str, str, float]] = {}
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS jobs (jk TEXT PRIMARY KEY, status TEXT NOT NULL, '
+                'timestamp REAL NOT NULL, query TEXT, region TEXT)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS verdicts (jk TEXT PRIMARY KEY, outcome TEXT NOT NULL, '
+                'reason TEXT NOT NULL, config_hash TEXT NOT NULL, expires REAL NOT NULL)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS submissions (jk TEXT, title TEXT, company TEXT, '
+                'location TEXT, salary TEXT, url TEXT, timestamp REAL)')
+            self._connection.execute('DELETE FROM verdicts WHERE expires <= ?', (time(),))
+            self._connection.commit()
+            self._applied.update(jk for jk, in self._connection.execute(
+                "SELECT jk FROM jobs WHERE status = 'applied'"))
+            for jk, *verdict in self._connection.execute('SELECT * FROM verdicts'):
+                self._verdicts[jk] = tuple(verdict)
+
+    def __contains__(self, jk: str) -> bool:
+        """
+        :return: whether the job has been applied to, by this or another process
+        """
+        if jk in self._applied:
+            return True
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM jobs WHERE jk = ? AND status = 'applied'", (jk,)).fetchone()
+        if row:
+            self._applied.add(jk)
+        return bool(row)
+
+    def __len__(self) -> int:
+        return len(self._applied)
+
+    def add(self, jk: str, status: str = 'applied', query: str = '', region: str = '') -> None:
+        """
+        Writes are committed in batches; call flush to commit straight away.
+        """
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO jobs (jk, status, timestamp, query, region) '
+                'VALUES (?, ?, ?, ?, ?)', (jk, status, time(), query, region))
+            self._pending += 1
+        if status == 'applied':
+            self._applied.add(jk)
+        if self._pending >= self._batch_size:
+            self.flush()
+        return None
+
+    def add_submission(self, jk: str, title: str, company: str, location: str, salary: str,
+            url: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                'INSERT INTO submissions (jk, title, company, location, salary, url, timestamp) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', (jk, title, company, location, salary, url, time()))
+            self._pending += 1
+        if self._pending >= self._batch_size:
+            self.flush()
+        return None
+
+    def add_verdict(self, jk: str, outcome: str, reason: str, ttl: float,
+            config_hash: str = '') -> None:
+        """
+        :param ttl: seconds until the job is evaluated again
+        :param config_hash: settings the verdict depends on; empty if it holds for any
+        """
+        verdict = (outcome, reason, config_hash, time() + ttl)
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO verdicts (jk, outcome, reason, config_hash, expires) '
+                'VALUES (?, ?, ?, ?, ?)', (jk, *verdict))
+            self._pending += 1
+        self._verdicts[jk] = verdict
+        if self._pending >= self._batch_size:
+            self.flush()
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM jobs')
+            self._connection.execute('DELETE FROM verdicts')
+            self._connection.commit()
+            self._pending = 0
+        self._applied.clear()
+        self._verdicts.clear()
+        return None
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+        return None
+
+    def export_submissions(self, file_name: str) -> int:
+        """
+        Writes every submission to an Excel workbook, replacing the file.
+        :return: number of submissions written
+        """
+        self.import_submissions(file_name)
+        self.flush()
+        with self._lock:
+            df = read_sql_query(
+                'SELECT title AS Title, company AS Company, location AS Location, '
+                'salary AS Salary, url AS URL FROM submissions ORDER BY rowid', self._connection)
+        with open(f"{file_name}.tmp", 'wb') as f:
+            df.to_excel(f, engine='openpyxl', sheet_name='jobs', index=False)
+        replace(f"{file_name}.tmp", file_name)
+        return len(df)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._pending:
+                self._connection.commit()
+                self._pending = 0
+        return None
+
+    def import_cache(self, file_name: str) -> int:
+        """
+        One-off import of the job keys of a plain text cache, one per line.
+        The file is renamed afterwards so it is not imported again.
+        :return: number of job keys imported
+        """
+        if not path.exists(file_name):
+            return 0
+        timestamp = path.getmtime(file_name)
+        with open(file_name) as f:
+            job_keys = {line.strip() for line in f} - {''}
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO jobs (jk, status, timestamp) VALUES (?, 'applied', ?) "
+                "ON CONFLICT (jk) DO UPDATE SET status = 'applied'",
+                ((jk, timestamp) for jk in job_keys))
+            self._connection.commit()
+            self._pending = 0
+        self._applied.update(job_keys)
+        replace(file_name, f"{file_name}.imported")
+        return len(job_keys)
+
+    def import_submissions(self, file_name: str) -> int:
+        """
+        One-off import of a workbook written by earlier versions. Nothing is
+        imported once the store holds any submission, so exports of the
+        store itself are never read back.
+        :return: number of submissions imported
+        """
+        with self._lock:
+            recorded = self._connection.execute('SELECT 1 FROM submissions LIMIT 1').fetchone()
+        if recorded or (not path.exists(file_name)):
+            return 0
+        df = read_excel(file_name, sheet_name='jobs', dtype=str).fillna('')
+        timestamp = path.getmtime(file_name)
+        with self._lock:
+            self._connection.executemany(
+                'INSERT INTO submissions (jk, title, company, location, salary, url, timestamp) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                ((url.rpartition('jk=')[2], title, company, location, salary, url, timestamp)
+                 for title, company, location, salary, url
+                 in df[['Title', 'Company', 'Location', 'Salary', 'URL']].itertuples(index=False)))
+            self._connection.commit()
+            self._pending = 0
+        return len(df)
+
+    def verdict(self, jk: str, config_hash: str = '') -> Optional[Tuple[str, str]]:
+        """
+        :return: outcome and reason of an unexpired verdict that holds for config_hash
+        """
+        verdict = self._verdicts.get(jk)
+        if (verdict is None) or (verdict[2] not in ('', config_hash)) or (verdict[3] <= time()):
+            return None
+        return verdict[0], verdict[1]
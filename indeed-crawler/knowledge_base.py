@@ -0,0 +1,170 @@
+from hashlib import sha256
+from json import dump as dump_json, dumps, load as load_json
+from os import listdir, makedirs, path, remove, replace, stat
+from re import compile as compile_regex
+from typing import Callable, Dict, List, Optional
+
+from numpy import argmax, array, float32, load, str_
+from numpy.lib.format import open_memmap
+from numpy.typing import NDArray
+
+from ann_index import IVFIndex
+from quantization import dequantize, dot, normalize, quantize
+
+_non_word = compile_regex(r'[\W_]+')
+
+
+def hash_file(file_name: str) -> str:
+    digest = sha256()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_model(file_name: str) -> str:
+    # Hashing several GB on every launch would defeat the purpose, so the model
+    # is fingerprinted by its size, modification time, head and tail.
+    info = stat(file_name)
+    digest = sha256(f"{info.st_size}:{info.st_mtime_ns}".encode())
+    with open(file_name, 'rb') as f:
+        digest.update(f.read(1 << 20))
+        f.seek(max(info.st_size - (1 << 20), 0))
+        digest.update(f.read(1 << 20))
+    return digest.hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    # Case folds and reduces punctuation and runs of whitespace to single spaces.
+    return ' '.join(_non_word.sub(' ', text.casefold()).split())
+
+
+class KnowledgeBase:
+    """
+    Compiled question/answer bank with L2-normalized question embeddings.
+    The embeddings are memory-mapped from disk and only questions that are
+    new since the last build are re-embedded. They are held as float32,
+    float16 or int8 with one scale per row. Banks of ann_threshold questions
+    or more are also given an IVF index for approximate search.
+    """
+    _version = 3
+
+    def __init__(self, directory: str = 'knowledge-base', dtype: str = 'float32'):
+        self.ann_threshold = 20000
+        self.answers: List[str] = []
+        self.dtype = dtype
+        self.index: Optional[IVFIndex] = None
+        self.key = ''
+        self.questions: List[str] = []
+        self.scales: Optional[NDArray[float32]] = None
+        self.vectors: NDArray = None
+        self._directory = directory
+        self._manifest_file = path.join(directory, 'manifest.json')
+
+    def compile(self, q_and_a: Dict[str, str], q_and_a_file: str, model_file: str,
+            sentence2vec: Callable[[NDArray[str_]], NDArray[float32]]) -> int:
+        """
+        Loads the compiled bank if it is up to date, otherwise rebuilds it.
+        :return: the number of questions that had to be embedded
+        """
+        keys = {'q_and_a': hash_file(q_and_a_file),
+                'input': sha256(dumps(q_and_a, sort_keys=True).encode()).hexdigest(),
+                'model': hash_model(model_file), 'dtype': self.dtype}
+        key = sha256(dumps(keys, sort_keys=True).encode()).hexdigest()
+        manifest = self._read_manifest()
+        if manifest.get('key') == key:
+            self._load(manifest)
+            return 0
+        questions, answers = list(q_and_a), list(q_and_a.values())
+        old_rows, old_vectors, old_scales = {}, None, None
+        old_keys = manifest.get('keys', {})
+        if (old_keys.get('model'), old_keys.get('dtype')) == (keys['model'], keys['dtype']):
+            old_rows = {question: i for i, question in enumerate(manifest['questions'])}
+            old_vectors = load(path.join(self._directory, manifest['vectors']), mmap_mode='r')
+            if manifest['scales']:
+                old_scales = load(path.join(self._directory, manifest['scales']), mmap_mode='r')
+        missing = [i for i, question in enumerate(questions) if question not in old_rows]
+        new_vectors, new_scales = None, None
+        if missing:
+            new_vectors, new_scales = quantize(normalize(
+                sentence2vec(array([questions[i] for i in missing], dtype=str))), self.dtype)
+        dim = new_vectors.shape[1] if new_vectors is not None else old_vectors.shape[1]
+        makedirs(self._directory, exist_ok=True)
+        vectors_file = f"vectors-{key[:16]}.npy"
+        vectors = open_memmap(path.join(self._directory, vectors_file), mode='w+',
+                              dtype=self.dtype, shape=(len(questions), dim))
+        scales_file, scales = '', None
+        if self.dtype == 'int8':
+            scales_file = f"scales-{key[:16]}.npy"
+            scales = open_memmap(path.join(self._directory, scales_file), mode='w+',
+                                 dtype=float32, shape=(len(questions),))
+        reused = [i for i, question in enumerate(questions) if question in old_rows]
+        if reused:
+            old = [old_rows[questions[i]] for i in reused]
+            vectors[reused] = old_vectors[old]
+            if scales is not None:
+                scales[reused] = old_scales[old]
+        if missing:
+            vectors[missing] = new_vectors
+            if scales is not None:
+                scales[missing] = new_scales
+        vectors.flush()
+        if scales is not None:
+            scales.flush()
+        index_file = ''
+        if len(questions) >= self.ann_threshold:
+            index_file = f"ivf-{key[:16]}.npz"
+            IVFIndex.build(dequantize(vectors, scales)).save(path.join(self._directory, index_file))
+        del vectors, scales, old_vectors, old_scales
+        manifest = {'version': self._version, 'key': key, 'keys': keys, 'vectors': vectors_file,
+                    'scales': scales_file, 'index': index_file, 'questions': questions,
+                    'answers': answers}
+        with open(f"{self._manifest_file}.tmp", 'w') as f:
+            dump_json(manifest, f)
+        replace(f"{self._manifest_file}.tmp", self._manifest_file)
+        self._remove_stale_vectors(vectors_file, scales_file, index_file)
+        self._load(manifest)
+        return len(missing)
+
+    def nearest(self, queries: NDArray[float32]) -> List[int]:
+        # Exact search for small banks, the IVF index for large ones.
+        if self.index:
+            return self.index.search(self.vectors, self.scales, queries)
+        return argmax(self.scores(queries), axis=1).tolist()
+
+    def scores(self, queries: NDArray[float32]) -> NDArray[float32]:
+        # Cosine similarities of normalized queries with every question.
+        return dot(self.vectors, self.scales, queries)
+
+    def _load(self, manifest: Dict) -> None:
+        self.answers = manifest['answers']
+        self.index = None
+        if manifest['index']:
+            self.index = IVFIndex.load(path.join(self._directory, manifest['index']))
+        self.key = manifest['key']
+        self.questions = manifest['questions']
+        self.scales = None
+        if manifest['scales']:
+            self.scales = load(path.join(self._directory, manifest['scales']), mmap_mode='r')
+        self.vectors = load(path.join(self._directory, manifest['vectors']), mmap_mode='r')
+        return None
+
+    def _read_manifest(self) -> Dict:
+        if not path.exists(self._manifest_file):
+            return {}
+        with open(self._manifest_file) as f:
+            manifest = load_json(f)
+        if (manifest.get('version') != self._version
+                or not path.exists(path.join(self._directory, manifest['vectors']))):
+            return {}
+        return manifest
+
+    def _remove_stale_vectors(self, *current: str) -> None:
+        for file_name in listdir(self._directory):
+            if file_name.startswith(('vectors-', 'scales-', 'ivf-')) and file_name not in current:
+                try:
+                    remove(path.join(self._directory, file_name))
+                except OSError:
+                    # Still mapped by another crawler process.
+                    pass
+        return None
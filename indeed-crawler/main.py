@@ -12,6 +12,7 @@ from typing import Dict, List, Set
 from webbrowser import open_new
 
 from indeed_crawler import IndeedCrawler
+from job_store import JobStore
 
 
 def center(window: Tk) -> None:
@@ -74,6 +75,8 @@ class App:
     }
     def __init__(self, root_window_: Tk):
         self._log_box: Text
+        # Continues the last run where it stopped instead of starting over.
+        self._resume = IntVar(value=0)
         self._start = True
         self._user_input = OrderedDict({
             'First Name': {'Variable': StringVar(), 'Entity': Entry, 'Regex': '^[A-Za-z]*$'},
@@ -221,7 +224,8 @@ class App:
         total_number_of_jobs = int(self._user_input['Number of Jobs']['Variable'].get())
         indeed_crawler = IndeedCrawler(total_number_of_jobs, input_q_and_a, self._log_box)
         new_thread = Thread(target=indeed_crawler.start_crawling,
-                            args=(list(company_negate_set), list(jobs_negate_set), queries, regions))
+                            args=(list(company_negate_set), list(jobs_negate_set), queries, regions,
+                                  bool(self._resume.get())))
         new_thread.start()
         return None
 
@@ -265,7 +269,9 @@ class App:
         add_frame.grid(row=row + 3, column=col, padx=padx, pady=pady, sticky='w')
         Button(add_frame, text='Reset Cache', command=self._reset_cache).grid(row=0, column=0, padx=(0, padx))
         Button(add_frame, text='Save Input', command=self._save_user_input).grid(row=0, column=1, padx=(0, padx))
-        Button(add_frame, text='Clear Input', command=self._clear_user_input).grid(row=0, column=2)
+        Button(add_frame, text='Clear Input', command=self._clear_user_input).grid(row=0, column=2, padx=(0, padx))
+        Button(add_frame, text='Export Results', command=self._export_results).grid(row=0, column=3, padx=(0, padx))
+        Checkbutton(add_frame, text='Resume Last Run', variable=self._resume).grid(row=0, column=4)
         self._toggle_start_button()
         return None
 
@@ -302,6 +308,15 @@ class App:
                 self._user_input[f"{label} {n}"]['Variable'].set('')
         return None
 
+    def _export_results(self) -> None:
+        job_store = JobStore()
+        exported = job_store.export_submissions('submissions.xlsx')
+        job_store.close()
+        self._log_box.configure(state='normal')
+        self._log_box.insert('end', f'\nExported {exported} submissions to submissions.xlsx.')
+        self._log_box.configure(state='disabled')
+        return None
+
     def _get_input_q_and_a(self) -> Dict:
         input_q_and_a = {}
         
@@ -379,6 +394,9 @@ class App:
         if path.exists('cache.txt'):
             with open('cache.txt', 'w') as cache:
                 cache.truncate()
+        job_store = JobStore()
+        job_store.clear()
+        job_store.close()
         return None
 
     def _save_user_input(self) -> None:
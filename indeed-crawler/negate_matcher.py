@@ -0,0 +1,45 @@
+from re import compile as compile_regex, escape
+from typing import Dict, Iterable, Optional
+from unicodedata import normalize as normalize_unicode
+
+
+def fold(text: str) -> str:
+    # Compatibility characters such as ligatures and full width letters are
+    # unified before case folding, so "Ｓｅｎｉｏｒ" matches "senior".
+    return normalize_unicode('NFKC', text).casefold()
+
+
+class NegateMatcher:
+    """
+    A negate list compiled into one alternation regex, so that a title is
+    scanned once instead of once per term. Longer terms come first in the
+    alternation, so the longest term starting at the first match wins.
+    """
+
+    def __init__(self, terms: Iterable[str], word_boundaries: bool = False):
+        """
+        :param word_boundaries: only match whole words, so "intern" skips "international"
+        """
+        # The hash of the filters a rejection was made with is taken over these.
+        self.terms = tuple(sorted({term for term in terms if term.strip()}))
+        self.word_boundaries = word_boundaries
+        self._originals: Dict[str, str] = {fold(term): term for term in self.terms}
+        self._regex = None
+        if self._originals:
+            alternation = '|'.join(escape(term) for term in sorted(
+                self._originals, key=lambda term: (-len(term), term)))
+            if word_boundaries:
+                alternation = rf"(?<!\w)(?:{alternation})(?!\w)"
+            self._regex = compile_regex(alternation)
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        :return: the term found in the text as it was given, or None
+        """
+        if self._regex is None:
+            return None
+        found = self._regex.search(fold(text))
+        return self._originals[found.group()] if found else None
@@ -0,0 +1,56 @@
+from random import uniform
+from time import perf_counter, sleep
+
+
+class Pacer:
+    """
+    Randomized, human-like pauses for one browser session. Pauses are scaled
+    to how long pages have been taking to become ready, capped per pause and
+    cut short once they take more than a budgeted share of the wall time.
+    Also keeps account of the time spent waiting for pages and pausing.
+    """
+
+    def __init__(self, budget: float = 0.25, max_pause: float = 3.0,
+            reference_latency: float = 2.0, smoothing: float = 0.2):
+        """
+        :param budget: largest share of the wall time to spend in pauses
+        :param max_pause: longest single pause in seconds
+        :param reference_latency: page latency in seconds at which pauses are not scaled
+        :param smoothing: weight of the latest page in the latency moving average
+        """
+        self.budget = budget
+        self.latency = reference_latency
+        self.max_pause = max_pause
+        self.paused = 0.0
+        # Pages whose DOM was still changing when the wait for it to settle ran out.
+        self.render_limits = 0
+        self.waited = 0.0
+        self._min_scale = 0.25
+        self._reference_latency = reference_latency
+        self._smoothing = smoothing
+        self._start_t = perf_counter()
+
+    def observe(self, seconds: float) -> None:
+        """
+        :param seconds: time a page took to become ready
+        """
+        self.waited += seconds
+        self.latency += self._smoothing * (seconds - self.latency)
+        return None
+
+    def pause(self, seconds: float, rand_lim: float) -> None:
+        # People wait longer on pages that load slowly, so fast pages get shorter pauses.
+        scale = min(max(self.latency / self._reference_latency, self._min_scale), 1.5)
+        if self.paused > self.budget * (perf_counter() - self._start_t):
+            scale = self._min_scale
+        delay = min((seconds + uniform(0, rand_lim)) * scale, self.max_pause)
+        sleep(delay)
+        self.paused += delay
+        return None
+
+    def report(self) -> str:
+        elapsed = perf_counter() - self._start_t
+        working = max(elapsed - self.waited - self.paused, 0)
+        return (f"{self.waited:.0f} s waiting for pages, {self.paused:.0f} s pausing and "
+                f"{working:.0f} s working of {elapsed:.0f} s, {self.render_limits} pages "
+                f"still changing at the render limit")
@@ -0,0 +1,35 @@
+from typing import List, Optional
+
+from lxml.etree import XPath
+from lxml.html import HtmlElement, fromstring
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+def first(selector: XPath, element: HtmlElement, **variables: str) -> Optional[HtmlElement]:
+    matches = selector(element, **variables)
+    return matches[0] if matches else None
+
+
+class PageSnapshot:
+    """
+    The source of one DOM state, fetched from the browser and parsed once.
+    Take a new snapshot after anything that changes the page.
+    """
+
+    def __init__(self, browser: WebDriver):
+        self.source: str = browser.page_source
+        self.url = browser.current_url
+        self._root: Optional[HtmlElement] = None
+
+    @property
+    def root(self) -> HtmlElement:
+        # Parsed on first use, so callers that only need the source skip the parse.
+        if self._root is None:
+            self._root = fromstring(self.source)
+        return self._root
+
+    def find(self, selector: XPath, **variables: str) -> Optional[HtmlElement]:
+        return first(selector, self.root, **variables)
+
+    def find_all(self, selector: XPath, **variables: str) -> List[HtmlElement]:
+        return selector(self.root, **variables)
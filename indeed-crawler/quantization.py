@@ -0,0 +1,43 @@
+from typing import Optional, Tuple
+
+from numpy import abs as absolute, einsum, float32, int8, int32, linalg, rint, where
+from numpy.typing import NDArray
+
+# Formats an embedding matrix can be held in, from largest to smallest.
+dtypes = ('float32', 'float16', 'int8')
+
+
+def dequantize(values: NDArray, scales: Optional[NDArray[float32]]) -> NDArray[float32]:
+    if scales is None:
+        return values.astype(float32)
+    return values.astype(float32) * scales[..., None]
+
+
+def dot(values: NDArray, scales: Optional[NDArray[float32]],
+        queries: NDArray[float32]) -> NDArray[float32]:
+    """
+    Dot products of every row of a (possibly quantized) matrix with one query
+    or a matrix of queries, accumulated in int32 for int8 rows and in float32
+    otherwise. The result has shape queries.shape[:-1] + (len(values),).
+    """
+    if values.dtype == int8:
+        query_values, query_scales = quantize(queries, 'int8')
+        return (einsum('ij,...j->...i', values, query_values, dtype=int32)
+                * scales * query_scales[..., None]).astype(float32)
+    if values.dtype == float32:
+        return queries.astype(float32) @ values.T
+    return einsum('ij,...j->...i', values, queries, dtype=float32)
+
+
+def normalize(vectors: NDArray[float32]) -> NDArray[float32]:
+    norms = linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / where(norms == 0, 1, norms)).astype(float32)
+
+
+def quantize(vectors: NDArray[float32], dtype: str) -> Tuple[NDArray, Optional[NDArray[float32]]]:
+    # int8 rows are scaled symmetrically so that the largest component maps to 127.
+    if dtype != 'int8':
+        return vectors.astype(dtype), None
+    scales = absolute(vectors).max(axis=-1) / 127
+    scales = where(scales == 0, 1, scales).astype(float32)
+    return rint(vectors / scales[..., None]).astype(int8), scales
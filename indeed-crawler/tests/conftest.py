@@ -0,0 +1,5 @@
+from os import path
+from sys import path as import_path
+
+# The crawler's modules are imported by their file names, as the application does.
+import_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
@@ -0,0 +1,66 @@
+from json import dumps
+from re import escape, fullmatch
+from types import SimpleNamespace
+
+from blocking import BlockingProfile
+
+# Assets of the fake job site in benchmark.py, under the hosts it maps to the local server.
+_fixture_urls = {
+    'banner': 'http://static.fake-indeed.com/assets/a1/banner.png',
+    'captcha': 'http://imgs.fake-hcaptcha.com/assets/a1/challenge.png',
+    'font': 'http://static.fake-indeed.com/assets/site.woff2',
+    'intro': 'http://static.fake-indeed.com/assets/a1/intro.mp3?v=2',
+    'page': 'http://127.0.0.1:8000/viewjob?jk=a1',
+    'stylesheet': 'http://static.fake-indeed.com/assets/site.css',
+    'tracker': 'http://ads.fake-doubleclick.net/assets/tracker.js'}
+
+
+def _blocked(profile: BlockingProfile) -> set:
+    # Chrome matches blocked URL patterns with '*' for any run of characters and '?' for one.
+    regexes = [''.join('.*' if c == '*' else '.' if c == '?' else escape(c) for c in pattern)
+               for pattern in profile.patterns()]
+    return {name for name, url in _fixture_urls.items()
+            if any(fullmatch(regex, url) for regex in regexes)}
+
+
+def test_default_profile_blocks_the_fixture_assets_only():
+    assert _blocked(BlockingProfile()) == {'banner', 'font', 'intro', 'tracker'}
+
+
+def test_allowed_domains_drop_rules():
+    profile = BlockingProfile(allow_domains=('fake-doubleclick.net',),
+                              deny_domains=('ads.fake-doubleclick.net',))
+    assert _blocked(profile) == {'banner', 'font', 'intro'}
+
+
+def test_allowed_types_drop_rules_of_their_type():
+    profile = BlockingProfile(allow_types={'Media': ('static.fake-indeed.com',)},
+                              deny_types={'Image': ('fake-indeed.com', 'fake-hcaptcha.com'),
+                                          'Media': ('static.fake-indeed.com',)})
+    assert _blocked(profile) == {'banner', 'captcha', 'tracker'}
+
+
+def test_wildcard_rules_cover_allowed_domains():
+    profile = BlockingProfile(allow_domains=('fake-hcaptcha.com',), deny_domains=(),
+                              deny_types={'Image': ('*',)})
+    assert _blocked(profile) == {'banner', 'captcha'}
+
+
+def test_collect_counts_blocked_and_loaded_requests():
+    events = [
+        ('Network.responseReceived', {'requestId': '1', 'type': 'Document'}),
+        ('Network.loadingFinished', {'requestId': '1', 'encodedDataLength': 2500}),
+        ('Network.loadingFailed',
+         {'requestId': '2', 'type': 'Image', 'blockedReason': 'inspector'}),
+        ('Network.loadingFailed',
+         {'requestId': '3', 'type': 'Font', 'errorText': 'net::ERR_FAILED'}),
+        ('Network.loadingFinished', {'requestId': '4', 'encodedDataLength': 500})]
+    browser = SimpleNamespace(get_log=lambda log: [
+        {'message': dumps({'message': {'method': method, 'params': params}})}
+        for method, params in events])
+    profile = BlockingProfile()
+    profile.collect(browser)
+    assert profile.blocked == {'Image': 1}
+    assert profile.loaded == {'Document': 1, 'Other': 1}
+    assert profile.loaded_bytes == {'Document': 2500, 'Other': 500}
+    assert profile.report() == 'blocked 1 requests (Image 1); loaded 2 requests, 0.0 MB'
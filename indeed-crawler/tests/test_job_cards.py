@@ -0,0 +1,68 @@
+from os import path
+from types import SimpleNamespace
+
+import pytest
+
+from job_cards import JobCardExtractor
+from page_snapshot import PageSnapshot
+
+_fixtures = path.join(path.dirname(path.abspath(__file__)), 'fixtures')
+
+
+def _snapshot(file_name: str) -> PageSnapshot:
+    with open(path.join(_fixtures, file_name)) as f:
+        browser = SimpleNamespace(page_source=f.read(), current_url='https://www.indeed.com/jobs')
+    return PageSnapshot(browser)
+
+
+def test_json_path():
+    extractor = JobCardExtractor()
+    cards = extractor.extract(_snapshot('results_json.html'))
+    assert cards == [
+        {'jk': 'a0b1c2d3e4f50601', 'title': 'Python Developer', 'company': 'Acme Analytics',
+         'salary': '$95,000 - $120,000 a year', 'location': 'Austin, TX', 'easy_apply': True},
+        {'jk': 'a0b1c2d3e4f50602', 'title': 'Data Engineer', 'company': 'Initech',
+         'salary': None, 'location': 'Remote', 'easy_apply': True},
+        {'jk': 'a0b1c2d3e4f50603', 'title': 'Site Reliability Engineer', 'company': 'Globex & Co',
+         'salary': None, 'location': 'Denver, CO', 'easy_apply': False}]
+    assert extractor.path_counts == {'json': 1}
+
+
+def test_markup_fallback():
+    extractor = JobCardExtractor()
+    cards = extractor.extract(_snapshot('results_dom.html'))
+    assert cards == [
+        {'jk': 'd1a2b3c4d5e6f701', 'title': 'Python Developer', 'company': 'Acme Analytics',
+         'salary': '$95,000 - $120,000 a year', 'location': 'Austin, TX', 'easy_apply': True},
+        {'jk': 'd1a2b3c4d5e6f702', 'title': 'Senior Backend Engineer', 'company': 'Globex',
+         'salary': None, 'location': 'Remote', 'easy_apply': False}]
+    assert extractor.path_counts == {'dom': 1}
+
+
+def test_malformed_json_falls_back_to_markup():
+    extractor = JobCardExtractor()
+    cards = extractor.extract(_snapshot('results_malformed_json.html'))
+    assert [(card['jk'], card['easy_apply']) for card in cards] == [('e7f8a9b0c1d20301', True)]
+    assert extractor.path_counts == {'dom': 1}
+
+
+@pytest.mark.parametrize('blob', [
+    '[]', '{"metaData": {}}', '{"metaData": null}',
+    '{"metaData": {"mosaicProviderJobCardsModel": {"results": {"a": 1}}}}',
+    '{"metaData": {"mosaicProviderJobCardsModel": {"results": [1]}}}'])
+def test_changed_json_shape_falls_back_to_markup(blob):
+    with open(path.join(_fixtures, 'results_dom.html')) as f:
+        source = f.read().replace('<head>', '<head><script>window.mosaic.providerData'
+                                  f'["mosaic-provider-jobcards"]={blob};</script>')
+    extractor = JobCardExtractor()
+    cards = extractor.extract(PageSnapshot(SimpleNamespace(page_source=source, current_url='')))
+    assert len(cards) == 2
+    assert extractor.path_counts == {'dom': 1}
+
+
+def test_path_counts_accumulate_over_pages():
+    extractor = JobCardExtractor()
+    for file_name in ('results_json.html', 'results_dom.html', 'results_json.html',
+                      'results_malformed_json.html'):
+        extractor.extract(_snapshot(file_name))
+    assert extractor.path_counts == {'json': 2, 'dom': 2}
@@ -0,0 +1,50 @@
+from fasttext import train_unsupervised
+from numpy import allclose
+from pytest import fixture
+
+from word_vectors import WordVectors, convert
+
+_corpus = ' '.join([
+    'the crawler answers screening questions about years of experience',
+    'are you authorized to work in the united states',
+    'do you have a valid driver license and reliable transportation',
+    'will you relocate to münchen or zürich for this role',
+    'do you speak español français or 日本語 fluently'] * 20)
+
+_sentences = [
+    # Kept words only.
+    'do you have a valid driver license',
+    # Kept multi-byte words.
+    'münchen zürich español français 日本語',
+    # Words the model has never seen, built from their subwords.
+    'visa sponsorship requirements',
+    'düsseldorf 東京 naïve',
+    # Both, with extra whitespace.
+    ' are you\tauthorized for  sponsorship\n',
+    '']
+
+
+@fixture(scope='module')
+def model_and_store(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('fasttext-model')
+    corpus_file = directory / 'corpus.txt'
+    corpus_file.write_text(_corpus, encoding='utf-8')
+    model = train_unsupervised(str(corpus_file), bucket=2000, dim=16, epoch=2, maxn=4,
+                               minCount=1, minn=2, thread=1, verbose=0)
+    model.save_model(str(directory / 'model.bin'))
+    convert(str(directory / 'model.bin'), str(directory / 'compact'),
+            len(model.get_words()))
+    return model, WordVectors(str(directory / 'compact'))
+
+
+def test_sentence_vectors_match_fasttext(model_and_store):
+    model, store = model_and_store
+    expected = [model.get_sentence_vector(sentence.replace('\n', ' '))
+                for sentence in _sentences]
+    assert allclose(store.get_sentence_vectors(_sentences), expected, atol=1e-6)
+
+
+def test_word_vectors_match_fasttext(model_and_store):
+    model, store = model_and_store
+    for word in ('license', 'zürich', '日本語', 'sponsorship', '東京'):
+        assert allclose(store.get_word_vector(word), model.get_word_vector(word), atol=1e-6)
@@ -0,0 +1,39 @@
+from random import uniform
+from typing import List, Tuple
+
+from selenium.webdriver import ActionChains
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class Typist:
+    """
+    Types text into the focused element of a browser. The pause before every
+    key is drawn up front, and each chunk of keys is sent as one ActionChains
+    sequence with its pauses built in, so a chunk costs one WebDriver call
+    instead of one call and one sleep per key. Instant mode inserts the text
+    in a single CDP Input.insertText call.
+    """
+
+    def __init__(self, chunk_size: int = 16, key_delay: Tuple[float, float] = (0.0, 0.25)):
+        """
+        :param chunk_size: keys sent per WebDriver call
+        :param key_delay: bounds of the random pause before each key, in seconds
+        """
+        self.chunk_size = chunk_size
+        self.key_delay = key_delay
+
+    def schedule(self, text: str) -> List[float]:
+        return [uniform(*self.key_delay) for _ in text]
+
+    def type(self, browser: WebDriver, text: str, instant: bool = False) -> None:
+        if instant:
+            browser.execute_cdp_cmd('Input.insertText', {'text': text})
+            return None
+        delays = self.schedule(text)
+        for start in range(0, len(text), self.chunk_size):
+            actions = ActionChains(browser)
+            for key, delay in zip(text[start:start + self.chunk_size],
+                                  delays[start:start + self.chunk_size]):
+                actions.pause(delay).send_keys(key)
+            actions.perform()
+        return None
@@ -0,0 +1,200 @@
+from argparse import ArgumentParser
+from json import dump as dump_json, load as load_json
+from mmap import ACCESS_READ, mmap
+from os import makedirs, path
+from re import compile as compile_regex
+from typing import Dict, List, Optional
+
+from fasttext import load_model
+from numpy import (
+    add, array, asarray, cumsum, float32, full, int32, int64, linalg, load, maximum, save, str_,
+    where, zeros)
+from numpy.lib.format import open_memmap
+from numpy.typing import NDArray
+
+from quantization import dequantize, dtypes, quantize
+
+# fasttext splits sentences on these characters only.
+_whitespace = compile_regex('[ \n\r\t\v\f\0]+')
+
+
+def fasttext_hash(data: bytes) -> int:
+    # FNV-1a as implemented by fasttext, which sign-extends every byte.
+    h = 2166136261
+    for byte in data:
+        h ^= byte if byte < 128 else byte | 0xFFFFFF00
+        h = (h * 16777619) & 0xFFFFFFFF
+    return h
+
+
+def tokenize(sentence: str) -> List[str]:
+    return [token for token in _whitespace.split(sentence) if token]
+
+
+class WordVectors:
+    """
+    Pruned, memory-mapped replacement for a fasttext model. Rows 0..words-1
+    hold the full vectors of the most frequent words and the remaining rows
+    hold the subword buckets used to build vectors for every other word.
+    Only the pages that are actually read are loaded into memory. Rows may be
+    stored as float16, or as int8 with one scale per row.
+    """
+
+    def __init__(self, directory: str):
+        with open(path.join(directory, 'meta.json')) as f:
+            meta = load_json(f)
+        self.dim: int = meta['dim']
+        self._bucket: int = meta['bucket']
+        # Plain ndarray views skip numpy.memmap's per-item overhead in _find.
+        self._index: NDArray[int32] = asarray(load(path.join(directory, 'index.npy'), mmap_mode='r'))
+        self._maxn: int = meta['maxn']
+        self._minn: int = meta['minn']
+        self._offsets: NDArray[int64] = asarray(
+            load(path.join(directory, 'offsets.npy'), mmap_mode='r'))
+        self._scales: Optional[NDArray[float32]] = None
+        if meta.get('dtype', 'float32') == 'int8':
+            self._scales = load(path.join(directory, 'scales.npy'), mmap_mode='r')
+        self._vectors: NDArray = load(path.join(directory, 'vectors.npy'), mmap_mode='r')
+        with open(path.join(directory, 'words.bin'), 'rb') as f:
+            self._words = mmap(f.fileno(), 0, access=ACCESS_READ)
+        self._number_of_words: int = meta['words']
+
+    def get_sentence_vector(self, sentence: str) -> NDArray[float32]:
+        return self.get_sentence_vectors([sentence])[0]
+
+    def get_sentence_vectors(self, sentences: NDArray[str_]) -> NDArray[float32]:
+        """
+        Encodes an array of sentences of any shape in one pass, like
+        numpy.vectorize(get_sentence_vector, signature='()->(n)') would.
+        Each sentence vector is the mean of its unit-length word vectors,
+        as in FastText::getSentenceVector.
+        """
+        sentences = asarray(sentences, dtype=str)
+        tokens = [tokenize(sentence) for sentence in sentences.ravel()]
+        vocabulary: Dict[str, int] = {}
+        token_ids = [vocabulary.setdefault(token, len(vocabulary))
+                     for sentence_tokens in tokens for token in sentence_tokens]
+        word_vectors = self._word_vectors(list(vocabulary))
+        norms = linalg.norm(word_vectors, axis=1)
+        unit_vectors = word_vectors / where(norms == 0, 1, norms)[:, None]
+        lengths = array([len(sentence_tokens) for sentence_tokens in tokens], dtype=int64)
+        sentence_vectors = zeros((len(tokens), self.dim), dtype=float32)
+        nonempty = lengths > 0
+        if token_ids:
+            starts = (cumsum(lengths) - lengths)[nonempty]
+            counts = add.reduceat((norms > 0)[token_ids].astype(float32), starts)
+            sentence_vectors[nonempty] = (add.reduceat(unit_vectors[token_ids], starts, axis=0)
+                                          / maximum(counts, 1)[:, None])
+        return sentence_vectors.reshape(sentences.shape + (self.dim,))
+
+    def get_word_vector(self, word: str) -> NDArray[float32]:
+        return self._word_vectors([word])[0]
+
+    def _find(self, word: str) -> int:
+        encoded = word.encode()
+        mask = len(self._index) - 1
+        slot = fasttext_hash(encoded) & mask
+        while True:
+            row = int(self._index[slot])
+            if row < 0:
+                return -1
+            if self._words[self._offsets[row]:self._offsets[row + 1]] == encoded:
+                return row
+            slot = (slot + 1) & mask
+
+    def _subword_rows(self, word: str) -> List[int]:
+        # Character n-grams of "<word>" over UTF-8 code points, as in Dictionary::computeSubwords.
+        encoded = f"<{word}>".encode()
+        size = len(encoded)
+        rows = []
+        for i in range(size):
+            if (encoded[i] & 0xC0) == 0x80:
+                continue
+            j, n = i, 1
+            while (j < size) and (n <= self._maxn):
+                j += 1
+                while (j < size) and ((encoded[j] & 0xC0) == 0x80):
+                    j += 1
+                if (n >= self._minn) and not ((n == 1) and ((i == 0) or (j == size))):
+                    rows.append(self._number_of_words + fasttext_hash(encoded[i:j]) % self._bucket)
+                n += 1
+        return rows
+
+    def _word_vectors(self, words: List[str]) -> NDArray[float32]:
+        # Kept words are one row each; any other word is the mean of its subword rows.
+        rows, lengths = [], []
+        for word in words:
+            row = self._find(word)
+            word_rows = [row] if row >= 0 else self._subword_rows(word)
+            rows.extend(word_rows)
+            lengths.append(len(word_rows))
+        lengths = array(lengths, dtype=int64)
+        word_vectors = zeros((len(words), self.dim), dtype=float32)
+        nonempty = lengths > 0
+        if rows:
+            starts = (cumsum(lengths) - lengths)[nonempty]
+            scales = None if self._scales is None else self._scales[rows]
+            sums = add.reduceat(dequantize(self._vectors[rows], scales), starts, axis=0)
+            word_vectors[nonempty] = sums / lengths[nonempty, None]
+        return word_vectors
+
+
+def convert(model_file: str, directory: str, number_of_words: int, dtype: str = 'float32',
+        chunk_size: int = 1 << 16) -> None:
+    model = load_model(model_file)
+    args = model.f.getArgs()
+    all_words = model.get_words(on_unicode_error='replace')
+    words = all_words[:number_of_words]
+    # A view of the fasttext input matrix; get_input_matrix would copy several GB.
+    buckets = asarray(model.f.getInputMatrix())[len(all_words):]
+    makedirs(directory, exist_ok=True)
+    shape = (len(words) + len(buckets), args.dim)
+    vectors = open_memmap(path.join(directory, 'vectors.npy'), mode='w+', dtype=dtype, shape=shape)
+    scales = None
+    if dtype == 'int8':
+        scales = open_memmap(path.join(directory, 'scales.npy'), mode='w+',
+                             dtype=float32, shape=shape[:1])
+    for start in range(0, shape[0], chunk_size):
+        stop = min(start + chunk_size, shape[0])
+        chunk = zeros((stop - start, args.dim), dtype=float32)
+        for row in range(start, min(stop, len(words))):
+            chunk[row - start] = model.get_word_vector(words[row])
+        if stop > len(words):
+            chunk[max(len(words) - start, 0):] = buckets[max(start - len(words), 0):stop - len(words)]
+        vectors[start:stop], chunk_scales = quantize(chunk, dtype)
+        if scales is not None:
+            scales[start:stop] = chunk_scales
+    vectors.flush()
+    if scales is not None:
+        scales.flush()
+    encoded = [word.encode() for word in words]
+    index = full(1 << (2 * len(words) - 1).bit_length(), -1, dtype=int32)
+    mask = len(index) - 1
+    for row, word in enumerate(encoded):
+        slot = fasttext_hash(word) & mask
+        while index[slot] >= 0:
+            slot = (slot + 1) & mask
+        index[slot] = row
+    offsets = zeros(len(words) + 1, dtype=int64)
+    offsets[1:] = cumsum([len(word) for word in encoded])
+    save(path.join(directory, 'index.npy'), index)
+    save(path.join(directory, 'offsets.npy'), offsets)
+    with open(path.join(directory, 'words.bin'), 'wb') as f:
+        f.write(b''.join(encoded))
+    with open(path.join(directory, 'meta.json'), 'w') as f:
+        dump_json({'bucket': len(buckets), 'dim': args.dim, 'dtype': dtype, 'maxn': args.maxn,
+                   'minn': args.minn, 'source': path.basename(model_file),
+                   'words': len(words)}, f)
+    return None
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Converts a fasttext binary into a compact word vector store.')
+    parser.add_argument('model_file', nargs='?', default='fasttext-model/cc.en.300.bin')
+    parser.add_argument('directory', nargs='?', default='fasttext-model/cc.en.300.compact')
+    parser.add_argument('--words', type=int, default=200000,
+                        help='number of most frequent words to keep whole vectors for')
+    parser.add_argument('--dtype', choices=dtypes, default='float32',
+                        help='storage format of the vectors; int8 stores one scale per row')
+    parsed = parser.parse_args()
+    convert(parsed.model_file, parsed.directory, parsed.words, parsed.dtype)